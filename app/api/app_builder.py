@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 from fastapi import FastAPI
@@ -5,6 +6,7 @@ from fastapi import FastAPI
 from app.config import main_service_config
 
 from . import routes
+from .queue_service import queue_service
 
 log = logging.getLogger(__name__)
 
@@ -12,6 +14,7 @@ log = logging.getLogger(__name__)
 def register_routers(app: FastAPI) -> None:
     app.include_router(routes.players_router)
     app.include_router(routes.config_router)
+    app.include_router(routes.queue_router)
     app.include_router(routes.test_router)
 
 
@@ -23,8 +26,14 @@ def register_events(app: FastAPI) -> None:
             "Token refresh time is "
             f"{main_service_config.token_refresh_time_seconds} seconds"
         )
+        app.state.queue_task = asyncio.create_task(queue_service.run())
+
+    @app.on_event("shutdown")
+    async def stop_queue():
+        app.state.queue_task.cancel()
 
     assert init_app
+    assert stop_queue
 
 
 def create_app() -> FastAPI:
@@ -0,0 +1,108 @@
+import asyncio
+from collections.abc import AsyncIterable, AsyncIterator, Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from pydantic import parse_raw_as
+
+from app.api.schema import MatchmakerBatchItemModel, MatchmakerResponeModel, PlayerModel
+from app.converters import MatchmakerConverter, PlayerConverter
+from app.exceptions import NotEnoughPlayersError
+from app.matchmaker.controller import MatchmakingController
+from app.matchmaking_config import (
+    MatchmakingConfig,
+    MatchmakingConfigHandler,
+    config,
+)
+
+# matchmaking calls running at once, others wait for a free worker
+MATCHMAKING_WORKERS = 4
+# player lists of a batch processed or waiting for a worker at once,
+# the rest of the batch isn't read until some of them are done
+MAX_PENDING_BATCH_ITEMS = MATCHMAKING_WORKERS * 2
+
+T = TypeVar("T")
+
+
+class MatchmakingService:
+    """
+    Creates games for api calls. Matchmaking is CPU-heavy, so it runs in
+    a bounded executor and the event loop keeps serving other requests,
+    such as health checks and config updates, meanwhile. Lobbies themselves
+    are balanced in processes if the config's lobby_workers is above 1.
+
+    The controller is recreated when the matchmaking config is updated
+    """
+
+    def __init__(
+        self,
+        config: MatchmakingConfig,
+        converter: MatchmakerConverter,
+        executor: Executor,
+    ) -> None:
+        self.config = config
+        self.converter = converter
+        self.executor = executor
+        self._config_version: int | None = None
+        self._controller: MatchmakingController
+
+    def get_controller(self) -> MatchmakingController:
+        if self._config_version != MatchmakingConfigHandler.config_version:
+            self._config_version = MatchmakingConfigHandler.config_version
+            self._controller = MatchmakingController(self.converter, self.config)
+        return self._controller
+
+    async def run_in_executor(self, func: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def create_games(self, players: list[PlayerModel]) -> MatchmakerResponeModel:
+        """Raises NotEnoughPlayersError if players don't fill a single game"""
+        controller = self.get_controller()
+        return await self.run_in_executor(controller.create_games, players)
+
+    async def create_games_batch(
+        self, lines: AsyncIterable[bytes]
+    ) -> AsyncIterator[MatchmakerBatchItemModel]:
+        """
+        Creates games of independent player lists, a JSON list per line,
+        concurrently. Yields results as soon as they are ready, so they may
+        come out of order. Invalid lists yield errors instead of results
+        """
+        controller = self.get_controller()
+        loop = asyncio.get_running_loop()
+        pending: set[asyncio.Future[MatchmakerBatchItemModel]] = set()
+        index = 0
+        async for line in lines:
+            pending.add(
+                loop.run_in_executor(
+                    self.executor, self._create_batch_item, controller, index, line
+                )
+            )
+            index += 1
+            if len(pending) >= MAX_PENDING_BATCH_ITEMS:
+                await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            done = {future for future in pending if future.done()}
+            pending -= done
+            for future in done:
+                yield future.result()
+        for next_done in asyncio.as_completed(pending):
+            yield await next_done
+
+    @staticmethod
+    def _create_batch_item(
+        controller: MatchmakingController, index: int, line: bytes
+    ) -> MatchmakerBatchItemModel:
+        try:
+            players = parse_raw_as(list[PlayerModel], line)
+            result = controller.create_games(players)
+        except (ValueError, NotEnoughPlayersError) as e:
+            return MatchmakerBatchItemModel(index=index, error=str(e))
+        return MatchmakerBatchItemModel(index=index, result=result)
+
+
+matchmaking_service = MatchmakingService(
+    config,
+    MatchmakerConverter(PlayerConverter()),
+    ThreadPoolExecutor(MATCHMAKING_WORKERS, thread_name_prefix="matchmaking"),
+)
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+
+from app.api.matchmaking_service import MatchmakingService, matchmaking_service
+from app.api.schema import MatchmakerResponeModel, PlayerModel
+from app.matchmaker.matchmaking_queue import MatchmakingQueue, MmrWindowSchedule
+from app.matchmaker.player import Player
+from app.matchmaking_config import MatchmakingConfigHandler
+
+log = logging.getLogger(__name__)
+
+
+class QueueService:
+    """
+    Runs the persistent matchmaking queue. Players join and leave it through
+    the api, lobbies are formed every config's queue_tick_seconds and their
+    games are kept until they are fetched.
+
+    The queue is only changed in the event loop, games are created in
+    the matchmaking service's executor. The queue follows matchmaking config
+    updates, queued players stay in the queue
+    """
+
+    def __init__(self, matchmaking_service: MatchmakingService) -> None:
+        self.matchmaking_service = matchmaking_service
+        self.config = matchmaking_service.config
+        self.converter = matchmaking_service.converter
+        self.queue = MatchmakingQueue()
+        self.results: list[MatchmakerResponeModel] = []
+        self._config_version: int | None = None
+
+    def join(self, player_model: PlayerModel) -> None:
+        """Raises PlayerAlreadyQueuedError if the player is already queued"""
+        player = self.converter.player_converter.get_matchmaker_player(player_model)
+        self.queue.join(player)
+
+    def leave(self, player_id: str) -> bool:
+        """Returns False if the player is not queued"""
+        return self.queue.leave(player_id) is not None
+
+    def tick(self) -> MatchmakerResponeModel | None:
+        """Creates games of lobbies formed from the queue, if there are any"""
+        players = self._pop_lobby_players()
+        if not players:
+            return None
+        controller = self.matchmaking_service.get_controller()
+        return self._add_result(controller.create_games_from_players(players))
+
+    def pop_results(self) -> list[MatchmakerResponeModel]:
+        results = self.results
+        self.results = []
+        return results
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.queue_tick_seconds)
+            try:
+                players = self._pop_lobby_players()
+                if not players:
+                    continue
+                controller = self.matchmaking_service.get_controller()
+                result = await self.matchmaking_service.run_in_executor(
+                    controller.create_games_from_players, players
+                )
+                self._add_result(result)
+            except Exception:
+                log.exception("Failed to create games from the queue")
+
+    def _pop_lobby_players(self) -> list[Player]:
+        self._sync_config()
+        return [player for lobby in self.queue.tick() for player in lobby]
+
+    def _add_result(self, result: MatchmakerResponeModel) -> MatchmakerResponeModel:
+        log.info(f"Created {len(result.games)} games from the queue")
+        self.results.append(result)
+        return result
+
+    def _sync_config(self) -> None:
+        if self._config_version == MatchmakingConfigHandler.config_version:
+            return
+        self._config_version = MatchmakingConfigHandler.config_version
+        self.queue.team_size = self.config.team_size
+        self.queue.window_schedule = MmrWindowSchedule(
+            [
+                (window.wait_seconds, window.max_mmr_spread)
+                for window in self.config.queue_mmr_windows
+            ]
+        )
+
+
+queue_service = QueueService(matchmaking_service)
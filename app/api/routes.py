@@ -1,14 +1,61 @@
 import logging
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.api.matchmaking_service import matchmaking_service
+from app.api.queue_service import queue_service
+from app.api.schema import MatchmakerResponeModel, PlayerModel
+from app.api.streaming import NDJSON_MEDIA_TYPE, encode_ndjson, iter_lines
+from app.exceptions import NotEnoughPlayersError, PlayerAlreadyQueuedError
 
 log = logging.getLogger(__name__)
 
 config_router = APIRouter(prefix="/config")
 players_router = APIRouter(prefix="/players")
+queue_router = APIRouter(prefix="/queue")
 test_router = APIRouter(prefix="/test")
 
 
 @test_router.post("/ping")
 def test_routers():
     return {"test": True}
+
+
+@players_router.post("", response_model=MatchmakerResponeModel)
+async def create_games(players: list[PlayerModel]) -> MatchmakerResponeModel:
+    try:
+        return await matchmaking_service.create_games(players)
+    except NotEnoughPlayersError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
+
+
+@players_router.post("/batch")
+async def create_games_batch(request: Request) -> StreamingResponse:
+    """
+    Accepts NDJSON with a player list per line and streams back
+    a MatchmakerBatchItemModel line per list as soon as it's ready
+    """
+    items = matchmaking_service.create_games_batch(iter_lines(request.stream()))
+    return StreamingResponse(encode_ndjson(items), media_type=NDJSON_MEDIA_TYPE)
+
+
+# queue routes are async, so they run in the event loop along with queue ticks
+@queue_router.post("/players", status_code=status.HTTP_201_CREATED)
+async def join_queue(player: PlayerModel) -> None:
+    try:
+        queue_service.join(player)
+    except PlayerAlreadyQueuedError as e:
+        raise HTTPException(status.HTTP_409_CONFLICT, str(e))
+
+
+@queue_router.delete("/players/{player_id}")
+async def leave_queue(player_id: str) -> None:
+    if not queue_service.leave(player_id):
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Player is not queued")
+
+
+@queue_router.get("/games", response_model=list[MatchmakerResponeModel])
+async def get_queue_games() -> list[MatchmakerResponeModel]:
+    """Returns games formed from the queue since the last call"""
+    return queue_service.pop_results()
@@ -13,6 +13,8 @@ class PlayerModel(BaseModel):
     arch: int
     igl: bool
     patreon: PatreonRole = PatreonRole.patreon_0
+    queue_time: float = 0
+    times_excluded: int = 0
 
 
 class PlayerReponseModel(BaseModel):
@@ -29,6 +31,12 @@ class TeamResponseModel(BaseModel):
     avg_mmr: float
 
 
+class TeamSplitResponseModel(BaseModel):
+    team1: TeamResponseModel
+    team2: TeamResponseModel
+    avg_mmr_diff: float
+
+
 class GameResponseModel(BaseModel):
     team1: TeamResponseModel
     team2: TeamResponseModel
@@ -36,6 +44,7 @@ class GameResponseModel(BaseModel):
     map: str
     faction1: Faction
     faction2: Faction
+    alternative_splits: list[TeamSplitResponseModel] = []
 
 
 class MatchmakerResponeModel(BaseModel):
@@ -43,5 +52,16 @@ class MatchmakerResponeModel(BaseModel):
     games: list[GameResponseModel]
 
 
+class MatchmakerBatchItemModel(BaseModel):
+    """
+    A result of a single player list of a batch, index is the list's position
+    in the batch. Either a result or an error is set
+    """
+
+    index: int
+    result: MatchmakerResponeModel | None = None
+    error: str | None = None
+
+
 class MatchmakingConfig(MMConfig):
     """Lookup to an actual config class"""
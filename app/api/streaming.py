@@ -0,0 +1,23 @@
+from collections.abc import AsyncIterable, AsyncIterator
+
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Splits a byte stream into non-empty lines, without buffering it whole"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+async def encode_ndjson(models: AsyncIterable[BaseModel]) -> AsyncIterator[str]:
+    async for model in models:
+        yield model.json() + "\n"
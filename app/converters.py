@@ -4,6 +4,7 @@ from app.api.schema import (
     PlayerModel,
     PlayerReponseModel,
     TeamResponseModel,
+    TeamSplitResponseModel,
 )
 from app.matchmaker.game.team import Team
 from app.matchmaker.player import Player, RoleProficiency
@@ -22,8 +23,11 @@ class PlayerConverter:
         player = Player(
             id=player_model.id,
             igl=player_model.igl,
-            mmr=player_model.igl,
+            mmr=player_model.mmr,
             role_proficiency=proficiency,
+            patreon=player_model.patreon,
+            queue_time=player_model.queue_time,
+            times_excluded=player_model.times_excluded,
         )
         return player
 
@@ -61,12 +65,30 @@ class MatchmakerConverter:
         result = TeamResponseModel(players=players, igl_id=igl_id, avg_mmr=team.avg_mmr)
         return result
 
+    def create_team_split_result(
+        self, team1: Team, team2: Team
+    ) -> TeamSplitResponseModel:
+        return TeamSplitResponseModel(
+            team1=self.create_team_result(team1),
+            team2=self.create_team_result(team2),
+            avg_mmr_diff=abs(team1.avg_mmr - team2.avg_mmr),
+        )
+
     def create_game_result(
-        self, map: Map, fac1: Faction, fac2: Faction, team1: Team, team2: Team
+        self,
+        map: Map,
+        fac1: Faction,
+        fac2: Faction,
+        team1: Team,
+        team2: Team,
+        alternative_splits: list[tuple[Team, Team]] | None = None,
     ) -> GameResponseModel:
         avg_mmr_diff = abs(team1.avg_mmr - team2.avg_mmr)
         team1_response = self.create_team_result(team1)
         team2_response = self.create_team_result(team2)
+        alternative_splits_response = [
+            self.create_team_split_result(*teams) for teams in alternative_splits or []
+        ]
         result = GameResponseModel(
             team1=team1_response,
             team2=team2_response,
@@ -74,6 +96,7 @@ class MatchmakerConverter:
             map=map.name,
             faction1=fac1,
             faction2=fac2,
+            alternative_splits=alternative_splits_response,
         )
         return result
 
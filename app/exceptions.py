@@ -41,3 +41,7 @@ class TeamsCreatingError(Exception):
     An error raised when teams creator can't find a single
     player combination satisfying all rules
     """
+
+
+class PlayerAlreadyQueuedError(Exception):
+    """An error raised when a player joins the queue twice"""
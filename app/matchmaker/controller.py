@@ -1,17 +1,22 @@
+import logging
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
 from copy import deepcopy
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Protocol
 
-from app.matchmaker.game.balancer_rules import (
-    ArchEqualityRule,
-    CavEqualityRule,
-    IglBalanceRule,
-    InfEqualityRule,
-)
-from app.matchmaker.game.player_balancer import PlayerBalancer
+from app.exceptions import TeamsCreatingError
+from app.matchmaker.game.branch_and_bound import AnytimeBalancer
+from app.matchmaker.game.compiled_rules import CompiledRules, compiled_rules_cache
+from app.matchmaker.game.joint_balancer import JointRoleBalancer
+from app.matchmaker.game.local_search import LocalSearchBalancer
+from app.matchmaker.game.player_balancer import PlayerBalancer, RelaxingPlayerBalancer
 from app.matchmaker.game.role_picker import RolePicker
 from app.matchmaker.game.role_picker_rules import (
     RoleLimitsConfigRetriever,
-    RolePickingRulesFactory,
+    RolePickingRules,
 )
 from app.matchmaker.game.role_swap import RoleSwapFactory
 from app.matchmaker.game.team import Team
@@ -19,18 +24,26 @@ from app.matchmaker.matchups.matchup_picker import (
     MatchupConfigRetriever,
     MatchupRandomPicker,
 )
-from app.matchmaker.player import Player
+from app.matchmaker.player import Player, PlayerRecord
 from app.matchmaker.player_picker import PlayerPicker
 from app.matchmaker.player_pool import PlayerPool
 from app.matchmaking_config import ClassLimitations, Faction, Map, MatchmakingConfig
 
+log = logging.getLogger(__name__)
+
 
 class MatchmakerConverterProtocol(Protocol):
     def get_player_ids(self, players: list[Player]) -> list[str]:
         ...
 
     def create_game_result(
-        self, map: Map, fac1: Faction, fac2: Faction, team1: Team, team2: Team
+        self,
+        map: Map,
+        fac1: Faction,
+        fac2: Faction,
+        team1: Team,
+        team2: Team,
+        alternative_splits: list[tuple[Team, Team]] | None = None,
     ) -> Any:
         ...
 
@@ -43,62 +56,244 @@ class MatchmakerConverterProtocol(Protocol):
         ...
 
 
+# biggest team size which splits are all enumerated, bigger teams
+# are balanced heuristically
+MAX_EXHAUSTIVE_TEAM_SIZE = 6
+
+
+@dataclass(frozen=True)
+class LobbyPayload:
+    """
+    A lobby's work passed to a worker process, players are kept as records
+    since players themselves reference their role observers
+    """
+
+    players: list[PlayerRecord]
+    team_size: int
+    matchup: tuple[Map, Faction, Faction]
+    role_limits: ClassLimitations
+    balance_time_budget: float | None
+
+
+@lru_cache
+def get_lobby_executor(workers: int) -> ProcessPoolExecutor:
+    """Returns a process pool shared by controllers with the same workers amount"""
+    return ProcessPoolExecutor(workers)
+
+
 class MatchmakingController:
     def __init__(
         self, converter: MatchmakerConverterProtocol, config: MatchmakingConfig
     ) -> None:
         self.converter = converter
         self.config = deepcopy(config)
+        compiled_rules_cache.compile_config(self.config)
 
-    def create_games(self, players: list[Any]) -> Any:
+    def create_games(
+        self, players: list[Any], balance_time_budget: float | None = None
+    ) -> Any:
         """
         Accepts a list of players and a convrerter to transform them into mm
         player objects
         Returns a converter export data, check the converter's export_to_response_model
         method for an export model specs
+
+        balance_time_budget limits team balancing time of each game in seconds,
+        the config's budget is used if it's not passed
         """
-        limits_config_retriever = RoleLimitsConfigRetriever(self.config)
         mm_players = self.converter.create_matchmaker_playerlist(players)
-        result_games: list[Any] = []
-        player_pools, excluded_players = self._create_player_pools(mm_players)
-        for player_pool in player_pools:
-            map, fac1, fac2 = self._choose_matchup()
-            role_limits = limits_config_retriever.get_map_role_limits(map)
-            players_with_chosen_roles = self._choose_roles(player_pool, role_limits)
-            team1, team2 = self._create_teams(players_with_chosen_roles)
-            game = self.converter.create_game_result(map, fac1, fac2, team1, team2)
-            result_games.append(game)
+        return self.create_games_from_players(mm_players, balance_time_budget)
+
+    def create_games_batch(
+        self, player_lists: Iterable[list[Any]], executor: Executor
+    ) -> Iterator[tuple[int, Any]]:
+        """
+        Creates games of independent player lists concurrently in an executor.
+        Yields list indexes with their create_games results as soon as
+        they are ready, so they may come out of order
+        """
+        futures = {
+            executor.submit(self.create_games, players): index
+            for index, players in enumerate(player_lists)
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+    def create_games_from_players(
+        self, mm_players: list[Player], balance_time_budget: float | None = None
+    ) -> Any:
+        """
+        The same as create_games, but accepts mm player objects,
+        so callers keeping their own players don't convert them twice
+        """
+        if balance_time_budget is None:
+            balance_time_budget = self.config.balance_time_budget
+        limits_config_retriever = RoleLimitsConfigRetriever(self.config)
+        # matchups are chosen in advance, so lobbies are grouped
+        # with their maps' role limits in mind
+        games_amount = len(mm_players) // (self.config.team_size * 2)
+        matchups = [self._choose_matchup() for _ in range(games_amount)]
+        games_role_limits = [
+            limits_config_retriever.get_map_role_limits(map) for map, _, _ in matchups
+        ]
+        player_pools, excluded_players = self._create_player_pools(
+            mm_players, games_role_limits
+        )
+        lobbies = [
+            LobbyPayload(
+                [player.export_record() for player in player_pool],
+                player_pool.team_size,
+                matchup,
+                role_limits,
+                balance_time_budget,
+            )
+            for player_pool, matchup, role_limits in zip(
+                player_pools, matchups, games_role_limits
+            )
+        ]
+        workers = self.config.lobby_workers
+        if workers > 1 and len(lobbies) > 1:
+            executor = get_lobby_executor(workers)
+            result_games = list(executor.map(self._create_game, lobbies))
+        else:
+            result_games = [
+                self._create_game(lobby, player_pool)
+                for lobby, player_pool in zip(lobbies, player_pools)
+            ]
         excluded_player_ids = [player.id for player in excluded_players]
         result = self.converter.create_matchmaker_response(
             result_games, excluded_player_ids
         )
         return result
 
-    def _create_teams(self, players: PlayerPool) -> tuple[Team, Team]:
-        balancer_rules = [
-            CavEqualityRule(),
-            InfEqualityRule(),
-            ArchEqualityRule(),
-            IglBalanceRule(),
-        ]
-        balancer = PlayerBalancer(players, balancer_rules)
-        team1, team2 = balancer.create_teams()
+    def _create_game(
+        self, lobby: LobbyPayload, player_pool: PlayerPool | None = None
+    ) -> Any:
+        """
+        Chooses roles and teams of a lobby and returns a converter game result.
+        Players are restored from the payload if the pool isn't passed
+        """
+        if player_pool is None:
+            players = [Player.from_record(record) for record in lobby.players]
+            player_pool = PlayerPool(players, lobby.team_size)
+        deadline = (
+            time.monotonic() + lobby.balance_time_budget
+            if lobby.balance_time_budget is not None
+            else None
+        )
+        team_splits = self._create_team_splits_with_roles(
+            player_pool, lobby.role_limits, deadline
+        )
+        (team1, team2), *alternative_splits = team_splits
+        map, fac1, fac2 = lobby.matchup
+        return self.converter.create_game_result(
+            map, fac1, fac2, team1, team2, alternative_splits
+        )
+
+    def _create_team_splits_with_roles(
+        self,
+        players: PlayerPool,
+        limits: ClassLimitations,
+        deadline: float | None = None,
+    ) -> list[tuple[Team, Team]]:
+        """
+        Chooses players' roles and creates team splits, either jointly
+        if it's enabled by the config or by picking roles first.
+        Falls back to picking roles first if joint balancing finds no split
+        """
+        rules = compiled_rules_cache.get_rules(limits, players.team_size)
+        if (
+            self.config.joint_role_balancing
+            and players.team_size <= MAX_EXHAUSTIVE_TEAM_SIZE
+        ):
+            try:
+                return [self._create_joint_teams(players, rules, deadline)]
+            except TeamsCreatingError:
+                log.info("Can't balance roles and teams jointly, picking roles first")
+        players_with_chosen_roles = self._choose_roles(players, rules.role_rules)
+        return self._create_team_splits(players_with_chosen_roles, rules, deadline)
+
+    def _create_joint_teams(
+        self,
+        players: PlayerPool,
+        rules: CompiledRules,
+        deadline: float | None = None,
+    ) -> tuple[Team, Team]:
+        balancer = JointRoleBalancer(
+            players,
+            rules.role_rules,
+            list(rules.balance_rules),
+            RoleSwapFactory(),
+            self.config.offclass_penalty,
+        )
+        team1, team2 = balancer.create_teams(deadline)
+        if deadline is not None and not balancer.is_optimal:
+            log.info("Team balancing time budget is exceeded, using the best split")
+        return team1, team2
+
+    def _create_team_splits(
+        self,
+        players: PlayerPool,
+        rules: CompiledRules,
+        deadline: float | None = None,
+    ) -> list[tuple[Team, Team]]:
+        """
+        Returns the best team split followed by the configured amount of
+        alternative ones. Alternatives are only available when all splits
+        are enumerated, that is for small teams without a time budget
+        """
+        alternatives_amount = self.config.alternative_splits_amount
+        if (
+            alternatives_amount == 0
+            or deadline is not None
+            or players.team_size > MAX_EXHAUSTIVE_TEAM_SIZE
+        ):
+            return [self._create_teams(players, rules, deadline)]
+        balancer = RelaxingPlayerBalancer(players, list(rules.balance_rules))
+        return balancer.create_ranked_teams(alternatives_amount + 1)
+
+    def _create_teams(
+        self,
+        players: PlayerPool,
+        rules: CompiledRules,
+        deadline: float | None = None,
+    ) -> tuple[Team, Team]:
+        # balancers may drop rules, so they get a copy of shared ones
+        balancer_rules = list(rules.balance_rules)
+        balancer: PlayerBalancer
+        if deadline is not None:
+            balancer = AnytimeBalancer(players, balancer_rules)
+        elif players.team_size <= MAX_EXHAUSTIVE_TEAM_SIZE:
+            balancer = RelaxingPlayerBalancer(players, balancer_rules)
+        else:
+            balancer = LocalSearchBalancer(players, balancer_rules)
+        team1, team2 = balancer.create_teams(deadline)
+        if deadline is not None and not balancer.is_optimal:
+            log.info("Team balancing time budget is exceeded, using the best split")
         return team1, team2
 
-    def _choose_roles(
-        self, players: PlayerPool, limits: ClassLimitations
-    ) -> PlayerPool:
-        rules_factory = RolePickingRulesFactory(limits)
-        rules = rules_factory.create_rules()
+    def _choose_roles(self, players: PlayerPool, rules: RolePickingRules) -> PlayerPool:
         swap_factory = RoleSwapFactory()
         role_picker = RolePicker(players, swap_factory, rules)
         result_playerpool = role_picker.set_player_roles()
         return result_playerpool
 
     def _create_player_pools(
-        self, players: list[Player]
+        self, players: list[Player], games_role_limits: list[ClassLimitations]
     ) -> tuple[list[PlayerPool], list[Player]]:
-        player_picker = PlayerPicker(players)
+        team_size = self.config.team_size
+        role_tables = [
+            compiled_rules_cache.get_rules(limits, team_size).feasible_table
+            for limits in games_role_limits
+        ]
+        player_picker = PlayerPicker(
+            players,
+            team_size,
+            role_tables,
+            self.config.lobby_role_swap_penalty,
+            self.config.sit_out_penalty,
+        )
+        player_picker.enroll_players()
         player_pools = player_picker.split_into_games()
         excluded_players = player_picker.excluded_players
         return player_pools, excluded_players
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 
+from app.enums import PlayerRole
 from app.exceptions import NotEnoughIglsError
+from app.matchmaker.game.split_table import SplitTable
 from app.matchmaker.game.team import Team
 from app.matchmaker.player import Player
 
@@ -10,18 +12,52 @@ class BalanceRule(ABC):
     def check_teams(self, team1: Team, team2: Team) -> bool:
         ...
 
+    @abstractmethod
+    def check_split(self, split_table: SplitTable, mask: int) -> bool:
+        """Checks a split encoded as a team1 bitmask of the split table"""
+
+    def check_splits(self, split_table: SplitTable) -> list[bool]:
+        """
+        Checks all splits of the split table at once.
+        Returns a column of results ordered as the table's masks
+        """
+        return [self.check_split(split_table, mask) for mask in split_table.masks]
+
+
+class RoleEqualityRule(BalanceRule):
+    """Base rule for an equal amount of role players in both teams"""
+
+    role: PlayerRole
+
+    def check_split(self, split_table: SplitTable, mask: int) -> bool:
+        team1_role_players = split_table.count_role(mask, self.role)
+        return team1_role_players * 2 == split_table.role_totals[self.role]
+
+    def check_splits(self, split_table: SplitTable) -> list[bool]:
+        role_total = split_table.role_totals[self.role]
+        return [
+            team1_role_players * 2 == role_total
+            for team1_role_players in split_table.get_role_counts(self.role)
+        ]
+
+
+class CavEqualityRule(RoleEqualityRule):
+    role = PlayerRole.cav
 
-class CavEqualityRule(BalanceRule):
     def check_teams(self, team1: Team, team2: Team) -> bool:
         return team1.total_cav == team2.total_cav
 
 
-class InfEqualityRule(BalanceRule):
+class InfEqualityRule(RoleEqualityRule):
+    role = PlayerRole.inf
+
     def check_teams(self, team1: Team, team2: Team) -> bool:
         return team1.total_inf == team2.total_inf
 
 
-class ArchEqualityRule(BalanceRule):
+class ArchEqualityRule(RoleEqualityRule):
+    role = PlayerRole.arch
+
     def check_teams(self, team1: Team, team2: Team) -> bool:
         return team1.total_arch == team2.total_arch
 
@@ -34,10 +70,21 @@ class IglBalanceRule(BalanceRule):
             return True
         return (igl1 in team1 and igl2 in team2) or (igl1 in team2 and igl2 in team1)
 
+    def check_split(self, split_table: SplitTable, mask: int) -> bool:
+        if split_table.best_igls_mask is None:
+            return True
+        return (mask & split_table.best_igls_mask).bit_count() == 1
+
+    def check_splits(self, split_table: SplitTable) -> list[bool]:
+        igls_mask = split_table.best_igls_mask
+        if igls_mask is None:
+            return [True] * len(split_table.masks)
+        return [(mask & igls_mask).bit_count() == 1 for mask in split_table.masks]
+
     def _find_best_igls(self, team1: Team, team2: Team) -> tuple[Player, Player]:
         all_players = team1 + team2
         igls = [igl for igl in all_players if igl.igl]
         if len(igls) < 2:
             raise NotEnoughIglsError
-        igls.sort(reverse=True)
+        igls.sort(key=lambda player: player.mmr, reverse=True)
         return igls[0], igls[1]
@@ -0,0 +1,301 @@
+import heapq
+import itertools
+
+from app.enums import PlayerRole
+from app.exceptions import TeamsCreatingError
+from app.matchmaker.game.balancer_rules import (
+    BalanceRule,
+    IglBalanceRule,
+    RoleEqualityRule,
+)
+from app.matchmaker.game.local_search import LocalSearchBalancer
+from app.matchmaker.game.player_balancer import PlayerBalancer
+from app.matchmaker.game.team import Team
+from app.matchmaker.player_pool import PlayerPool
+
+
+class BranchAndBoundBalancer(PlayerBalancer):
+    """
+    Exact player balancer that assigns players to teams one by one in
+    descending mmr order and prunes partial assignments that can't beat
+    the best split found so far.
+
+    A partial assignment is pruned when an admissible lower bound of its final
+    mmr difference is not lower than the current best one, when a team gets more
+    role players than role equality rules allow or when both best igls get into
+    the same team. Rules of other types are checked on complete splits only.
+
+    Finds a split with the same mmr difference as PlayerBalancer does, unless
+    the deadline passes, in which case the best split found so far is returned.
+    Amount of search nodes visited by the last search is kept in visited_nodes.
+    """
+
+    def __init__(self, players: PlayerPool, rules: list[BalanceRule]) -> None:
+        super().__init__(players, rules)
+        self.team_size = len(players) // 2
+        players_mmr = players.columns.mmr_raw
+        self.order = sorted(
+            range(len(players)), key=players_mmr.__getitem__, reverse=True
+        )
+        self.mmrs = [players_mmr[index] for index in self.order]
+        # remaining_mmr[n] is a sum of mmr of players from n-th to the last one
+        self.remaining_mmr = list(itertools.accumulate(reversed(self.mmrs), initial=0))[
+            ::-1
+        ]
+        self.visited_nodes = 0
+
+    def _create_teams_with_current_rules(self) -> tuple[Team, Team]:
+        self._prepare_rules()
+        self.visited_nodes = 0
+        self._best_diff: int | None = None
+        self._best_assignment: list[int] | None = None
+        assignment = [0] * len(self.order)
+        team_sums = [0, 0]
+        team_sizes = [0, 0]
+        role_counts = [
+            {role: 0 for role in self._role_targets},
+            {role: 0 for role in self._role_targets},
+        ]
+        self._search(0, assignment, team_sums, team_sizes, role_counts)
+        if self._best_assignment is None:
+            raise TeamsCreatingError
+        return self._build_teams(self._best_assignment)
+
+    def _prepare_rules(self) -> None:
+        self._role_targets: dict[PlayerRole, int] = {}
+        self._other_rules: list[BalanceRule] = []
+        self._best_igls: tuple[int, int] | None = None
+        for rule in self.rules:
+            if isinstance(rule, RoleEqualityRule):
+                role_total = self.players.get_role_players_amount(rule.role)
+                if role_total % 2 == 1:
+                    raise TeamsCreatingError
+                self._role_targets[rule.role] = role_total // 2
+            elif isinstance(rule, IglBalanceRule):
+                self._best_igls = self._find_best_igls()
+            else:
+                self._other_rules.append(rule)
+        self._roles = [self.players[index].current_role for index in self.order]
+
+    def _find_best_igls(self) -> tuple[int, int] | None:
+        """
+        Returns ascending search positions of 2 best igls,
+        None if there are less than 2 igls
+        """
+        igl_indexes = [index for index, player in enumerate(self.players) if player.igl]
+        if len(igl_indexes) < 2:
+            return None
+        igl_indexes.sort(key=lambda index: self.players[index].mmr, reverse=True)
+        first_position, second_position = sorted(
+            self.order.index(igl_index) for igl_index in igl_indexes[:2]
+        )
+        return first_position, second_position
+
+    def _search(
+        self,
+        position: int,
+        assignment: list[int],
+        team_sums: list[int],
+        team_sizes: list[int],
+        role_counts: list[dict[PlayerRole, int]],
+    ) -> None:
+        self.visited_nodes += 1
+        if self._best_assignment is not None and self._is_out_of_time():
+            self.is_optimal = False
+            return
+        if position == len(self.order):
+            self._check_leaf(assignment, abs(team_sums[0] - team_sums[1]))
+            return
+        if self._best_diff is not None and (
+            self._get_lower_bound(position, team_sums, team_sizes) >= self._best_diff
+        ):
+            return
+        role = self._roles[position]
+        for team in self._get_allowed_teams(
+            position, assignment, team_sums, team_sizes, role_counts
+        ):
+            assignment[position] = team
+            team_sums[team] += self.mmrs[position]
+            team_sizes[team] += 1
+            if role in self._role_targets:
+                role_counts[team][role] += 1
+            self._search(position + 1, assignment, team_sums, team_sizes, role_counts)
+            team_sums[team] -= self.mmrs[position]
+            team_sizes[team] -= 1
+            if role in self._role_targets:
+                role_counts[team][role] -= 1
+            if self._best_diff == 0 or not self.is_optimal:
+                return
+
+    def _get_allowed_teams(
+        self,
+        position: int,
+        assignment: list[int],
+        team_sums: list[int],
+        team_sizes: list[int],
+        role_counts: list[dict[PlayerRole, int]],
+    ) -> list[int]:
+        """
+        Returns teams the player at a given position can be put into without
+        breaking the rules, the weaker team goes first.
+        The first player is always put into the first team to skip mirrored splits
+        """
+        if position == 0:
+            return [0]
+        teams = [0, 1] if team_sums[0] <= team_sums[1] else [1, 0]
+        role = self._roles[position]
+        allowed_teams = []
+        for team in teams:
+            if team_sizes[team] == self.team_size:
+                continue
+            if role in self._role_targets and (
+                role_counts[team][role] == self._role_targets[role]
+            ):
+                continue
+            if self._best_igls is not None and position == self._best_igls[1]:
+                if assignment[self._best_igls[0]] == team:
+                    continue
+            allowed_teams.append(team)
+        return allowed_teams
+
+    def _get_lower_bound(
+        self, position: int, team_sums: list[int], team_sizes: list[int]
+    ) -> int:
+        """
+        Returns a lower bound of the final team mmr sums difference.
+        Remaining players are sorted by mmr, so team1 can get at most the sum of
+        the next players and at least the sum of the last players.
+        """
+        team1_slots = self.team_size - team_sizes[0]
+        remaining_mmr = self.remaining_mmr[position]
+        max_team1_gain = remaining_mmr - self.remaining_mmr[position + team1_slots]
+        min_team1_gain = self.remaining_mmr[len(self.order) - team1_slots]
+        current_diff = team_sums[0] - team_sums[1]
+        min_diff = current_diff + 2 * min_team1_gain - remaining_mmr
+        max_diff = current_diff + 2 * max_team1_gain - remaining_mmr
+        if min_diff > 0:
+            return min_diff
+        if max_diff < 0:
+            return -max_diff
+        return 0
+
+    def _check_leaf(self, assignment: list[int], mmr_diff: int) -> None:
+        if self._best_diff is not None and mmr_diff >= self._best_diff:
+            return
+        if self._other_rules:
+            team1, team2 = self._build_teams(assignment)
+            if not all(rule.check_teams(team1, team2) for rule in self._other_rules):
+                return
+        self._best_diff = mmr_diff
+        self._best_assignment = list(assignment)
+
+    def _build_teams(self, assignment: list[int]) -> tuple[Team, Team]:
+        """
+        Builds teams in the pool's players order,
+        the first team always contains the first player of the pool
+        """
+        player_teams = [0] * len(self.order)
+        for position, index in enumerate(self.order):
+            player_teams[index] = assignment[position]
+        team1_players = []
+        team2_players = []
+        for player, team in zip(self.players, player_teams):
+            if team == player_teams[0]:
+                team1_players.append(player)
+            else:
+                team2_players.append(player)
+        return Team(team1_players, self.team_size), Team(team2_players, self.team_size)
+
+
+SearchNode = tuple[int, int, int, list[int], list[int], list[int], list[dict]]
+
+
+class AnytimeBalancer(BranchAndBoundBalancer):
+    """
+    Best-first variant of the branch-and-bound balancer, meant to be used
+    with a per-lobby deadline.
+
+    Starts from a LocalSearchBalancer split, then expands partial assignments
+    with the lowest mmr difference bound first, deeper ones first on ties.
+    Search ends when no partial assignment can beat the best split, which proves
+    it optimal, or when the deadline passes, so a good split is always available.
+    """
+
+    def _create_teams_with_current_rules(self) -> tuple[Team, Team]:
+        self._prepare_rules()
+        self.visited_nodes = 0
+        self._best_diff = None
+        self._best_assignment = None
+        self._set_heuristic_split()
+        counter = itertools.count()
+        root_role_counts: list[dict] = [
+            {role: 0 for role in self._role_targets},
+            {role: 0 for role in self._role_targets},
+        ]
+        root: SearchNode = (0, 0, next(counter), [], [0, 0], [0, 0], root_role_counts)
+        frontier = [root]
+        while frontier:
+            bound, _, _, assignment, team_sums, team_sizes, role_counts = heapq.heappop(
+                frontier
+            )
+            if self._best_diff is not None and bound >= self._best_diff:
+                break
+            if self._best_assignment is not None and self._is_out_of_time():
+                self.is_optimal = False
+                break
+            self.visited_nodes += 1
+            position = len(assignment)
+            if position == len(self.order):
+                self._check_leaf(assignment, bound)
+                continue
+            for team in self._get_allowed_teams(
+                position, assignment, team_sums, team_sizes, role_counts
+            ):
+                child_sums = list(team_sums)
+                child_sums[team] += self.mmrs[position]
+                child_sizes = list(team_sizes)
+                child_sizes[team] += 1
+                child_role_counts = [dict(counts) for counts in role_counts]
+                role = self._roles[position]
+                if role in self._role_targets:
+                    child_role_counts[team][role] += 1
+                child_bound = self._get_lower_bound(
+                    position + 1, child_sums, child_sizes
+                )
+                if self._best_diff is not None and child_bound >= self._best_diff:
+                    continue
+                heapq.heappush(
+                    frontier,
+                    (
+                        child_bound,
+                        -position - 1,
+                        next(counter),
+                        assignment + [team],
+                        child_sums,
+                        child_sizes,
+                        child_role_counts,
+                    ),
+                )
+        if self._best_assignment is None:
+            raise TeamsCreatingError
+        return self._build_teams(self._best_assignment)
+
+    def _set_heuristic_split(self) -> None:
+        """Uses a local search split as the initial best one, if there is any"""
+        heuristic_balancer = LocalSearchBalancer(self.players, list(self.rules))
+        try:
+            team1, _ = heuristic_balancer._create_teams_with_current_rules()
+        except TeamsCreatingError:
+            return
+        first_team_ids = {id(player) for player in team1}
+        if id(self.players[self.order[0]]) not in first_team_ids:
+            first_team_ids = {id(player) for player in self.players} - first_team_ids
+        assignment = [
+            0 if id(self.players[index]) in first_team_ids else 1
+            for index in self.order
+        ]
+        team_sums = [0, 0]
+        for position, team in enumerate(assignment):
+            team_sums[team] += self.mmrs[position]
+        self._best_diff = abs(team_sums[0] - team_sums[1])
+        self._best_assignment = assignment
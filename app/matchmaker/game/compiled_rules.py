@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+
+from app.matchmaker.game.balancer_rules import (
+    ArchEqualityRule,
+    BalanceRule,
+    CavEqualityRule,
+    IglBalanceRule,
+    InfEqualityRule,
+)
+from app.matchmaker.game.role_picker_rules import (
+    FeasibleRoleCountsTable,
+    RoleCounts,
+    RoleLimitsConfigRetriever,
+    RolePickingRules,
+    RolePickingRulesFactory,
+)
+from app.matchmaker.player import ALL_ROLES
+from app.matchmaking_config import (
+    ClassLimitations,
+    MatchmakingConfig,
+    MatchmakingConfigHandler,
+)
+
+LimitsKey = tuple[int | bool, ...]
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    """
+    Rules of games with the same class limitations and team size, built once
+    and shared between games. Rule objects are stateless, so sharing them is
+    safe as long as nobody mutates them; balancers which drop rules should get
+    a list copy of balance_rules.
+
+    Boundaries and role count vectors are ordered as ALL_ROLES,
+    feasible_table answers role rules for every pool role count vector
+    """
+
+    role_rules: RolePickingRules
+    balance_rules: tuple[BalanceRule, ...]
+    min_counts: RoleCounts
+    max_counts: RoleCounts
+    feasible_table: FeasibleRoleCountsTable
+
+    @property
+    def valid_role_counts(self) -> tuple[RoleCounts, ...]:
+        return self.feasible_table.feasible_role_counts
+
+
+class CompiledRulesCache:
+    """
+    Compiled rules keyed by class limitations and team size.
+    The cache is dropped whenever the matchmaking config version changes,
+    that is on every MatchmakingConfigHandler.update_config call
+    """
+
+    def __init__(self) -> None:
+        self._config_version = MatchmakingConfigHandler.config_version
+        self._compiled_rules: dict[tuple[LimitsKey, int], CompiledRules] = {}
+
+    def get_rules(self, limits: ClassLimitations, team_size: int) -> CompiledRules:
+        if self._config_version != MatchmakingConfigHandler.config_version:
+            self._config_version = MatchmakingConfigHandler.config_version
+            self._compiled_rules.clear()
+        key = self._get_limits_key(limits), team_size
+        compiled_rules = self._compiled_rules.get(key)
+        if compiled_rules is None:
+            compiled_rules = self._compile(limits, team_size)
+            self._compiled_rules[key] = compiled_rules
+        return compiled_rules
+
+    def compile_config(self, config: MatchmakingConfig) -> None:
+        """
+        Compiles rules of every map type and map with its own class limitations,
+        so games don't pay for compiling
+        """
+        limits_retriever = RoleLimitsConfigRetriever(config)
+        for map_type in config.map_types.values():
+            self.get_rules(map_type.class_limitations, config.team_size)
+        for map in config.maps:
+            self.get_rules(limits_retriever.get_map_role_limits(map), config.team_size)
+
+    @staticmethod
+    def _get_limits_key(limits: ClassLimitations) -> LimitsKey:
+        return tuple(getattr(limits, field) for field in ClassLimitations.__fields__)
+
+    @staticmethod
+    def _compile(limits: ClassLimitations, team_size: int) -> CompiledRules:
+        role_rules = RolePickingRulesFactory(limits).create_rules()
+        min_counts = tuple(role_rules.min[role].boundary for role in ALL_ROLES)
+        max_counts = tuple(role_rules.max[role].boundary for role in ALL_ROLES)
+        feasible_table = role_rules.get_feasible_table(team_size * 2)
+        balance_rules = (
+            CavEqualityRule(),
+            InfEqualityRule(),
+            ArchEqualityRule(),
+            IglBalanceRule(),
+        )
+        return CompiledRules(
+            role_rules=role_rules,
+            balance_rules=balance_rules,
+            min_counts=min_counts,
+            max_counts=max_counts,
+            feasible_table=feasible_table,
+        )
+
+
+compiled_rules_cache = CompiledRulesCache()
@@ -0,0 +1,232 @@
+import itertools
+import time
+from functools import lru_cache
+
+from app.exceptions import TeamsCreatingError
+from app.matchmaker.game.balancer_rules import BalanceRule, RoleEqualityRule
+from app.matchmaker.game.role_assignment import ALL_ROLES, RoleCounts, RoleCountsTable
+from app.matchmaker.game.role_picker_rules import RolePickingRules
+from app.matchmaker.game.role_swap import RoleSwapFactory
+from app.matchmaker.game.split_table import SplitTable
+from app.matchmaker.game.team import Team
+from app.matchmaker.player_pool import PlayerPool
+
+RoleCountsPair = tuple[RoleCounts, RoleCounts]
+
+
+@lru_cache
+def get_feasible_team_role_counts(
+    team_size: int,
+    role_boundaries: tuple[tuple[int, int], ...],
+    balanced_roles: tuple[bool, ...],
+) -> tuple[RoleCountsPair, ...]:
+    """
+    Returns pairs of team role count vectors, which sums fit min and max
+    pool role boundaries and which have equal counts of balanced roles.
+    Boundaries and balanced flags are ordered as ALL_ROLES
+    """
+    team_role_counts = [
+        role_counts
+        for role_counts in itertools.product(
+            range(team_size + 1), repeat=len(ALL_ROLES)
+        )
+        if sum(role_counts) == team_size
+    ]
+    feasible_pairs = []
+    for team1_counts, team2_counts in itertools.product(team_role_counts, repeat=2):
+        if all(
+            min_players <= team1_counts[index] + team2_counts[index] <= max_players
+            and (not is_balanced or team1_counts[index] == team2_counts[index])
+            for index, ((min_players, max_players), is_balanced) in enumerate(
+                zip(role_boundaries, balanced_roles)
+            )
+        ):
+            feasible_pairs.append((team1_counts, team2_counts))
+    return tuple(feasible_pairs)
+
+
+class JointRoleBalancer:
+    """
+    Chooses players' roles and splits them into teams in a single search,
+    instead of picking roles first and balancing teams with fixed roles.
+
+    A split costs its avg mmr difference plus offclass_penalty per point of
+    proficiency lost by players playing offclass. Role picking rules and role
+    equality rules are hard constraints, encoded as precomputed feasible pairs
+    of team role count vectors. The best roles of a split come from a role count
+    table of each team. Splits are visited in ascending mmr difference order
+    and the search stops when the pool's minimal proficiency loss can't make
+    the cost lower, so the result is optimal unless the deadline passes.
+
+    Other balance rules are checked on splits, best igls are picked by mmr
+    before roles are changed. Chosen roles are applied via role swaps.
+    """
+
+    def __init__(
+        self,
+        players: PlayerPool,
+        role_rules: RolePickingRules,
+        balance_rules: list[BalanceRule],
+        swap_factory: RoleSwapFactory,
+        offclass_penalty: float,
+    ) -> None:
+        self.players = players
+        self.role_rules = role_rules
+        self.balance_rules = balance_rules
+        self.swap_factory = swap_factory
+        self.offclass_penalty = offclass_penalty
+        self.split_table = SplitTable(players)
+        self.deadline: float | None = None
+        self.is_optimal = True
+        self.visited_splits = 0
+
+    def create_teams(self, deadline: float | None = None) -> tuple[Team, Team]:
+        """
+        Sets players' roles and returns teams with the lowest cost.
+        Raises TeamsCreatingError if no split satisfies the rules
+        """
+        self.deadline = deadline
+        self.is_optimal = True
+        self.visited_splits = 0
+        split_table = self.split_table
+        feasible_pairs = self._get_feasible_pairs()
+        if not feasible_pairs:
+            raise TeamsCreatingError
+        max_counts = tuple(
+            max(
+                max(team1_counts[index], team2_counts[index])
+                for team1_counts, team2_counts in feasible_pairs
+            )
+            for index in range(len(ALL_ROLES))
+        )
+        min_penalty = self.offclass_penalty * self._get_min_loss(feasible_pairs)
+        best_cost: float | None = None
+        best_split: tuple[int, RoleCountsTable, RoleCountsTable, RoleCountsPair]
+        for split_index in self._get_sorted_split_indexes():
+            mmr_diff = split_table.mmr_diffs[split_index]
+            if best_cost is not None:
+                if mmr_diff + min_penalty >= best_cost:
+                    break
+                if self._is_out_of_time():
+                    self.is_optimal = False
+                    break
+            self.visited_splits += 1
+            mask = split_table.masks[split_index]
+            team1_table, team2_table = self._create_team_tables(mask, max_counts)
+            best_pair = self._find_best_pair(team1_table, team2_table, feasible_pairs)
+            if best_pair is None:
+                continue
+            loss, pair = best_pair
+            cost = mmr_diff + self.offclass_penalty * loss
+            if best_cost is None or cost < best_cost:
+                best_cost = cost
+                best_split = split_index, team1_table, team2_table, pair
+        if best_cost is None:
+            raise TeamsCreatingError
+        return self._apply_split(*best_split)
+
+    def _get_feasible_pairs(self) -> tuple[RoleCountsPair, ...]:
+        role_boundaries = tuple(
+            (self.role_rules.min[role].boundary, self.role_rules.max[role].boundary)
+            for role in ALL_ROLES
+        )
+        balanced_roles = {
+            rule.role
+            for rule in self.balance_rules
+            if isinstance(rule, RoleEqualityRule)
+        }
+        return get_feasible_team_role_counts(
+            self.split_table.team_size,
+            role_boundaries,
+            tuple(role in balanced_roles for role in ALL_ROLES),
+        )
+
+    def _get_min_loss(self, feasible_pairs: tuple[RoleCountsPair, ...]) -> int:
+        """
+        Returns the minimal proficiency loss of the pool over feasible vectors,
+        a lower bound of a loss of any split
+        """
+        pool_table = RoleCountsTable(self.players)
+        pool_losses = [
+            pool_table.get_loss(
+                tuple(
+                    team1_count + team2_count
+                    for team1_count, team2_count in zip(team1_counts, team2_counts)
+                )
+            )
+            for team1_counts, team2_counts in feasible_pairs
+        ]
+        return min(loss for loss in pool_losses if loss is not None)
+
+    def _get_sorted_split_indexes(self) -> list[int]:
+        """
+        Returns indexes of splits passing balance rules other than role equality
+        ones, in ascending mmr difference order
+        """
+        split_table = self.split_table
+        rule_columns = [
+            rule.check_splits(split_table)
+            for rule in self.balance_rules
+            if not isinstance(rule, RoleEqualityRule)
+        ]
+        split_indexes = [
+            split_index
+            for split_index, rule_results in enumerate(zip(*rule_columns))
+            if all(rule_results)
+        ]
+        if not rule_columns:
+            split_indexes = list(range(len(split_table.masks)))
+        split_indexes.sort(key=split_table.mmr_diffs.__getitem__)
+        return split_indexes
+
+    def _create_team_tables(
+        self, mask: int, max_counts: RoleCounts
+    ) -> tuple[RoleCountsTable, RoleCountsTable]:
+        team1_players = []
+        team2_players = []
+        for index, player in enumerate(self.players):
+            if mask >> index & 1:
+                team1_players.append(player)
+            else:
+                team2_players.append(player)
+        return (
+            RoleCountsTable(team1_players, max_counts),
+            RoleCountsTable(team2_players, max_counts),
+        )
+
+    @staticmethod
+    def _find_best_pair(
+        team1_table: RoleCountsTable,
+        team2_table: RoleCountsTable,
+        feasible_pairs: tuple[RoleCountsPair, ...],
+    ) -> tuple[int, RoleCountsPair] | None:
+        """Returns a feasible pair with the lowest loss and the loss itself"""
+        best_pair: tuple[int, RoleCountsPair] | None = None
+        for team1_counts, team2_counts in feasible_pairs:
+            team1_loss = team1_table.get_loss(team1_counts)
+            team2_loss = team2_table.get_loss(team2_counts)
+            if team1_loss is None or team2_loss is None:
+                continue
+            loss = team1_loss + team2_loss
+            if best_pair is None or loss < best_pair[0]:
+                best_pair = loss, (team1_counts, team2_counts)
+        return best_pair
+
+    def _apply_split(
+        self,
+        split_index: int,
+        team1_table: RoleCountsTable,
+        team2_table: RoleCountsTable,
+        pair: RoleCountsPair,
+    ) -> tuple[Team, Team]:
+        mask = self.split_table.masks[split_index]
+        team1_roles = iter(team1_table.restore_roles(pair[0]))
+        team2_roles = iter(team2_table.restore_roles(pair[1]))
+        for index, player in enumerate(self.players):
+            role = next(team1_roles) if mask >> index & 1 else next(team2_roles)
+            if player.current_role != role:
+                self.swap_factory(player, role).apply()
+        return self.split_table.create_teams(mask)
+
+    def _is_out_of_time(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
@@ -0,0 +1,210 @@
+import heapq
+import itertools
+
+from app.enums import PlayerRole
+from app.exceptions import TeamsCreatingError
+from app.matchmaker.game.balancer_rules import (
+    BalanceRule,
+    IglBalanceRule,
+    RoleEqualityRule,
+)
+from app.matchmaker.game.player_balancer import PlayerBalancer
+from app.matchmaker.game.team import Team
+from app.matchmaker.player import Player
+from app.matchmaker.player_pool import PlayerPool
+
+PlayerPair = tuple[Player, Player]
+
+
+class LocalSearchBalancer(PlayerBalancer):
+    """
+    Heuristic player balancer for big teams, where enumerating all splits is
+    too slow. Works in O(n^2) per improvement step instead of O(C(n, n/2)).
+
+    Players are split into groups by role, roles without a role equality rule
+    share a single group. Players of a group are paired by mmr, players of
+    a pair always go into different teams, so role equality rules are satisfied
+    by construction. Pairs are distributed between teams with the Karmarkar-Karp
+    differencing method, then the split is improved by swapping players of the
+    same group between teams while it lowers the mmr difference.
+    Best igls are kept in different teams, other rules are checked on the result.
+    The result is never marked as optimal.
+    """
+
+    def __init__(self, players: PlayerPool, rules: list[BalanceRule]) -> None:
+        super().__init__(players, rules)
+        self.team_size = len(players) // 2
+
+    def _create_teams_with_current_rules(self) -> tuple[Team, Team]:
+        self.is_optimal = False
+        self._balanced_roles = self._get_balanced_roles()
+        self._best_igls = self._get_best_igls()
+        pairs = self._create_pairs()
+        team1_players, team2_players = self._distribute_pairs(pairs)
+        self._separate_best_igls(team1_players, team2_players)
+        self._improve_by_swaps(team1_players, team2_players)
+        team1, team2 = self._build_teams(team1_players, team2_players)
+        if not all(rule.check_teams(team1, team2) for rule in self.rules):
+            raise TeamsCreatingError
+        return team1, team2
+
+    def _get_balanced_roles(self) -> set[PlayerRole]:
+        """
+        Returns roles of role equality rules.
+        Raises TeamsCreatingError if any of them has an odd amount of players
+        """
+        balanced_roles = set()
+        for rule in self.rules:
+            if isinstance(rule, RoleEqualityRule):
+                if self.players.check_odd_role_players_amount(rule.role):
+                    raise TeamsCreatingError
+                balanced_roles.add(rule.role)
+        return balanced_roles
+
+    def _get_best_igls(self) -> list[Player]:
+        if not any(isinstance(rule, IglBalanceRule) for rule in self.rules):
+            return []
+        igls = [player for player in self.players if player.igl]
+        if len(igls) < 2:
+            return []
+        igls.sort(key=lambda player: player.mmr, reverse=True)
+        return igls[:2]
+
+    def _get_group(self, player: Player) -> PlayerRole | None:
+        if player.current_role in self._balanced_roles:
+            return player.current_role
+        return None
+
+    def _create_pairs(self) -> list[PlayerPair]:
+        """
+        Pairs neighbouring by mmr players of each group. Best igls of the same
+        group are paired with each other. Every group has an even amount of
+        players, since pool size is even and balanced roles have no odd amounts
+        """
+        groups: dict[PlayerRole | None, list[Player]] = {}
+        for player in self.players:
+            groups.setdefault(self._get_group(player), []).append(player)
+        pairs: list[PlayerPair] = []
+        if self._best_igls:
+            igl1, igl2 = self._best_igls
+            if self._get_group(igl1) == self._get_group(igl2):
+                pairs.append((igl1, igl2))
+                groups[self._get_group(igl1)].remove(igl1)
+                groups[self._get_group(igl2)].remove(igl2)
+        for group_players in groups.values():
+            group_players.sort(key=lambda player: player.mmr_raw, reverse=True)
+            pairs += zip(group_players[::2], group_players[1::2])
+        return pairs
+
+    def _distribute_pairs(
+        self, pairs: list[PlayerPair]
+    ) -> tuple[list[Player], list[Player]]:
+        """
+        Karmarkar-Karp differencing over pairs. Each pair is a partial split
+        with its mmr difference, two partial splits with the biggest differences
+        are merged by putting the stronger side of one with the weaker side of
+        another, until a single split is left
+        """
+        counter = itertools.count()
+        heap: list[tuple[int, int, list[Player], list[Player]]] = []
+        for player1, player2 in pairs:
+            stronger, weaker = sorted(
+                (player1, player2), key=lambda player: player.mmr_raw, reverse=True
+            )
+            diff = stronger.mmr_raw - weaker.mmr_raw
+            heapq.heappush(heap, (-diff, next(counter), [stronger], [weaker]))
+        while len(heap) > 1:
+            diff1, _, stronger1, weaker1 = heapq.heappop(heap)
+            diff2, _, stronger2, weaker2 = heapq.heappop(heap)
+            merged_diff = -diff1 + diff2
+            heapq.heappush(
+                heap,
+                (-merged_diff, next(counter), stronger1 + weaker2, weaker1 + stronger2),
+            )
+        _, _, team1_players, team2_players = heap[0]
+        return team1_players, team2_players
+
+    def _separate_best_igls(
+        self, team1_players: list[Player], team2_players: list[Player]
+    ) -> None:
+        """
+        Moves the 2nd best igl into the other team if both best igls are in
+        the same one, swapping it with a player of its group that keeps
+        the mmr difference lowest
+        """
+        if not self._best_igls:
+            return
+        igl1, igl2 = self._best_igls
+        for igl_team, other_team in (
+            (team1_players, team2_players),
+            (team2_players, team1_players),
+        ):
+            if igl1 in igl_team and igl2 in igl_team:
+                break
+        else:
+            return
+        diff = self._get_mmr_diff(igl_team, other_team)
+        candidates = [
+            index
+            for index, player in enumerate(other_team)
+            if self._get_group(player) == self._get_group(igl2)
+        ]
+        best_index = min(
+            candidates,
+            key=lambda index: abs(
+                diff - 2 * (igl2.mmr_raw - other_team[index].mmr_raw)
+            ),
+        )
+        igl_index = igl_team.index(igl2)
+        igl_team[igl_index], other_team[best_index] = other_team[best_index], igl2
+
+    def _improve_by_swaps(
+        self, team1_players: list[Player], team2_players: list[Player]
+    ) -> None:
+        """
+        Repeatedly applies the best swap of two players between teams that
+        lowers the mmr difference. Only players of the same group are swapped
+        and best igls are not swapped, so the rules stay satisfied
+        """
+        diff = self._get_mmr_diff(team1_players, team2_players)
+        while diff != 0:
+            best_swap: tuple[int, int] | None = None
+            best_diff = abs(diff)
+            for index1, player1 in enumerate(team1_players):
+                if player1 in self._best_igls:
+                    continue
+                for index2, player2 in enumerate(team2_players):
+                    if player2 in self._best_igls:
+                        continue
+                    if self._get_group(player1) != self._get_group(player2):
+                        continue
+                    swapped_diff = abs(diff - 2 * (player1.mmr_raw - player2.mmr_raw))
+                    if swapped_diff < best_diff:
+                        best_diff = swapped_diff
+                        best_swap = index1, index2
+            if best_swap is None:
+                return
+            index1, index2 = best_swap
+            player1, player2 = team1_players[index1], team2_players[index2]
+            diff -= 2 * (player1.mmr_raw - player2.mmr_raw)
+            team1_players[index1], team2_players[index2] = player2, player1
+
+    @staticmethod
+    def _get_mmr_diff(team1_players: list[Player], team2_players: list[Player]) -> int:
+        return sum(player.mmr_raw for player in team1_players) - sum(
+            player.mmr_raw for player in team2_players
+        )
+
+    def _build_teams(
+        self, team1_players: list[Player], team2_players: list[Player]
+    ) -> tuple[Team, Team]:
+        """
+        Builds teams in the pool's players order,
+        the first team always contains the first player of the pool
+        """
+        team1_ids = {id(player) for player in team1_players}
+        if id(self.players[0]) not in team1_ids:
+            team1_ids = {id(player) for player in team2_players}
+        team1 = [player for player in self.players if id(player) in team1_ids]
+        team2 = [player for player in self.players if id(player) not in team1_ids]
+        return Team(team1, self.team_size), Team(team2, self.team_size)
@@ -1,39 +1,74 @@
+import heapq
 import itertools
 import logging
-from collections.abc import Iterable
-from copy import copy
+import time
+from collections.abc import Callable, Iterable
+from typing import TypeVar
 
 from app.exceptions import TeamsCreatingError
 from app.matchmaker.game.balancer_rules import BalanceRule
+from app.matchmaker.game.split_table import SplitTable
 from app.matchmaker.game.team import Team
 from app.matchmaker.player import Player
 from app.matchmaker.player_pool import PlayerPool
 
 log = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class PlayerBalancer:
+    """
+    Brute-force player balancer, checks every players combination.
+
+    create_teams accepts an optional deadline as a time.monotonic timestamp.
+    When it passes, the best teams found so far are returned and is_optimal is
+    set to False. is_optimal is True when the result is proven to be the best
+    split for the rules left after relaxation.
+
+    create_ranked_teams returns several best distinct splits at once,
+    ranked by mmr difference.
+    """
+
     def __init__(self, players: PlayerPool, rules: list[BalanceRule]) -> None:
         self.players = players
         self.rules = rules
+        self.deadline: float | None = None
+        self.is_optimal = False
 
-    def create_teams(self) -> tuple[Team, Team]:
-        best_teams: tuple[Team, Team] | None = None
-        while best_teams is None:
+    def create_teams(self, deadline: float | None = None) -> tuple[Team, Team]:
+        self.deadline = deadline
+        self.is_optimal = True
+        return self._relax_rules_on_failure(self._create_teams_with_current_rules)
+
+    def create_ranked_teams(
+        self, amount: int, deadline: float | None = None
+    ) -> list[tuple[Team, Team]]:
+        """
+        Returns up to the given amount of best distinct splits,
+        ordered by mmr difference, in a single pass over splits
+        """
+        self.deadline = deadline
+        self.is_optimal = True
+        return self._relax_rules_on_failure(
+            lambda: self._create_ranked_teams_with_current_rules(amount)
+        )
+
+    def _relax_rules_on_failure(self, create: Callable[[], T]) -> T:
+        while True:
             try:
-                best_teams = self._create_teams_with_current_rules()
+                return create()
             except TeamsCreatingError:
                 rule = self.rules.pop()
                 log.info(
                     "Can't create teams using the current ruleset"
                     f"removing {rule} and trying again"
                 )
-        return best_teams
 
     def _create_teams_with_current_rules(self) -> tuple[Team, Team]:
         best_teams: tuple[Team, Team] | None = None
         best_mmr_diff: float | None = None
-        for players in itertools.combinations(self.players, 6):
+        for players in itertools.combinations(self.players, self.players.team_size):
             team1, team2 = self._get_teams_by_players(players)
             if not all((rule.check_teams(team1, team2) for rule in self.rules)):
                 continue
@@ -41,15 +76,174 @@ class PlayerBalancer:
             if best_mmr_diff is None or current_mmr_diff < best_mmr_diff:
                 best_mmr_diff = current_mmr_diff
                 best_teams = team1, team2
+            if best_teams is not None and self._is_out_of_time():
+                self.is_optimal = False
+                break
         if best_teams is None:
             raise TeamsCreatingError
         return best_teams
 
+    def _create_ranked_teams_with_current_rules(
+        self, amount: int
+    ) -> list[tuple[Team, Team]]:
+        # a bounded heap of the best splits, the worst one is on top
+        ranked_splits: list[tuple[float, int, tuple[Team, Team]]] = []
+        combinations = itertools.combinations(self.players, self.players.team_size)
+        for split_index, players in enumerate(combinations):
+            if players[0] is not self.players[0]:
+                # all remaining combinations are mirrors of already checked ones
+                break
+            team1, team2 = self._get_teams_by_players(players)
+            if not all((rule.check_teams(team1, team2) for rule in self.rules)):
+                continue
+            ranked_split = (
+                -abs(team1.avg_mmr - team2.avg_mmr),
+                -split_index,
+                (team1, team2),
+            )
+            if len(ranked_splits) < amount:
+                heapq.heappush(ranked_splits, ranked_split)
+            elif ranked_split[:2] > ranked_splits[0][:2]:
+                heapq.heapreplace(ranked_splits, ranked_split)
+            if ranked_splits and self._is_out_of_time():
+                self.is_optimal = False
+                break
+        if not ranked_splits:
+            raise TeamsCreatingError
+        ranked_splits.sort(reverse=True)
+        return [teams for _, _, teams in ranked_splits]
+
+    def _is_out_of_time(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
     def _get_teams_by_players(self, players: Iterable[Player]) -> tuple[Team, Team]:
         team1_playerlist = list(players)
-        team2_playerlist = copy(self.players)
+        team2_playerlist = list(self.players)
         for player in team1_playerlist:
             team2_playerlist.remove(player)
-        team1 = Team(team1_playerlist)
-        team2 = Team(team2_playerlist)
+        team1 = Team(team1_playerlist, self.players.team_size)
+        team2 = Team(team2_playerlist, self.players.team_size)
         return team1, team2
+
+
+class BitmaskPlayerBalancer(PlayerBalancer):
+    """
+    Player balancer that enumerates splits as team1 bitmasks of a split table.
+    Mirrored splits are skipped, rules are checked against precomputed split data
+    and team objects are only created for the best split.
+    Picks the same teams as PlayerBalancer does.
+    """
+
+    def __init__(self, players: PlayerPool, rules: list[BalanceRule]) -> None:
+        super().__init__(players, rules)
+        self.split_table = SplitTable(players)
+
+    def _create_teams_with_current_rules(self) -> tuple[Team, Team]:
+        split_table = self.split_table
+        best_split_index: int | None = None
+        best_mmr_diff: float | None = None
+        for split_index, mask in enumerate(split_table.masks):
+            if not all(rule.check_split(split_table, mask) for rule in self.rules):
+                continue
+            current_mmr_diff = split_table.get_mmr_diff(split_index)
+            if best_mmr_diff is None or current_mmr_diff < best_mmr_diff:
+                best_mmr_diff = current_mmr_diff
+                best_split_index = split_index
+            if best_split_index is not None and self._is_out_of_time():
+                self.is_optimal = False
+                break
+        if best_split_index is None:
+            raise TeamsCreatingError
+        return split_table.create_teams(split_table.masks[best_split_index])
+
+
+class BatchPlayerBalancer(BitmaskPlayerBalancer):
+    """
+    Player balancer that scores all splits of a split table in batches.
+    Every rule checks all splits in a single call, producing a column of results,
+    the best split is an argmin of mmr differences over splits passing all rules.
+    Picks the same teams as PlayerBalancer does.
+    All splits are scored regardless of the deadline.
+    """
+
+    def _create_teams_with_current_rules(self) -> tuple[Team, Team]:
+        return self._create_ranked_teams_with_current_rules(1)[0]
+
+    def _create_ranked_teams_with_current_rules(
+        self, amount: int
+    ) -> list[tuple[Team, Team]]:
+        split_table = self.split_table
+        rule_columns = [rule.check_splits(split_table) for rule in self.rules]
+        if rule_columns:
+            split_results: Iterable[bool] = map(all, zip(*rule_columns))
+        else:
+            split_results = itertools.repeat(True, len(split_table.masks))
+        valid_split_indexes = [
+            split_index
+            for split_index, is_valid in enumerate(split_results)
+            if is_valid
+        ]
+        if not valid_split_indexes:
+            raise TeamsCreatingError
+        return self._create_ranked_splits(valid_split_indexes, amount)
+
+    def _create_ranked_splits(
+        self, split_indexes: list[int], amount: int
+    ) -> list[tuple[Team, Team]]:
+        """
+        Creates teams for the given amount of splits with the lowest
+        mmr difference, splits with equal differences keep their order
+        """
+        split_table = self.split_table
+        best_split_indexes = heapq.nsmallest(
+            amount, split_indexes, key=split_table.mmr_diffs.__getitem__
+        )
+        return [
+            split_table.create_teams(split_table.masks[split_index])
+            for split_index in best_split_indexes
+        ]
+
+
+class RelaxingPlayerBalancer(BatchPlayerBalancer):
+    """
+    Batch player balancer that relaxes rules in a single pass over splits.
+    Instead of dropping the last rule and re-enumerating all splits after each
+    failure, it counts how many leading rules every split satisfies and picks
+    the best split among those satisfying the longest rules prefix.
+    Picks the same teams as PlayerBalancer does and leaves the rules list intact.
+    All splits are scored regardless of the deadline.
+    """
+
+    def create_teams(self, deadline: float | None = None) -> tuple[Team, Team]:
+        return self.create_ranked_teams(1, deadline)[0]
+
+    def create_ranked_teams(
+        self, amount: int, deadline: float | None = None
+    ) -> list[tuple[Team, Team]]:
+        self.deadline = deadline
+        self.is_optimal = True
+        passed_rules_column = self._get_passed_rules_column()
+        best_passed_rules = max(passed_rules_column)
+        if best_passed_rules < len(self.rules):
+            log.info(
+                "Can't create teams using the full ruleset, "
+                f"ignoring {self.rules[best_passed_rules:]}"
+            )
+        split_indexes = [
+            split_index
+            for split_index, passed_rules in enumerate(passed_rules_column)
+            if passed_rules == best_passed_rules
+        ]
+        return self._create_ranked_splits(split_indexes, amount)
+
+    def _get_passed_rules_column(self) -> list[int]:
+        """Returns an amount of leading rules satisfied by every split"""
+        split_table = self.split_table
+        rules_amount = len(self.rules)
+        if not self.rules:
+            return [0] * len(split_table.masks)
+        rule_columns = [rule.check_splits(split_table) for rule in self.rules]
+        return [
+            rule_results.index(False) if False in rule_results else rules_amount
+            for rule_results in zip(*rule_columns)
+        ]
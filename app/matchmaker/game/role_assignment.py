@@ -0,0 +1,118 @@
+from collections.abc import Iterator, Sequence
+
+from app.enums import PlayerRole
+from app.matchmaker.game.role_picker_rules import RoleCounts, RolePickingRules
+from app.matchmaker.player import ALL_ROLES, Player
+
+
+class RoleCountsTable:
+    """
+    Minimal total proficiency loss of players for every reachable role count
+    vector, role counts are ordered as ALL_ROLES. Built with dynamic programming
+    over players, so an assignment reaching any vector is restored in O(n).
+    Vectors exceeding max_counts are not tracked.
+    """
+
+    def __init__(
+        self, players: Sequence[Player], max_counts: RoleCounts | None = None
+    ) -> None:
+        # a role count vector is encoded as an int with a digit per role,
+        # so adding a player of a role is a single addition
+        self._base = len(players) + 1
+        self._role_steps = [self._base**index for index in range(len(ALL_ROLES))]
+        self._losses: dict[int, int] = {0: 0}
+        # choices[n] maps a vector after n+1 players to a role index
+        # chosen for the n-th player
+        self._choices: list[dict[int, int]] = []
+        for player in players:
+            self._add_player(player, max_counts)
+
+    def get_loss(self, role_counts: RoleCounts) -> int | None:
+        """Returns a minimal loss of a vector, None if it's not reachable"""
+        return self._losses.get(self._encode(role_counts))
+
+    def iter_losses(self) -> Iterator[tuple[RoleCounts, int]]:
+        for encoded_counts, loss in self._losses.items():
+            yield self._decode(encoded_counts), loss
+
+    def restore_roles(self, role_counts: RoleCounts) -> list[PlayerRole]:
+        """Returns players' roles reaching a vector with its minimal loss"""
+        encoded_counts = self._encode(role_counts)
+        roles = []
+        for player_choices in reversed(self._choices):
+            role_index = player_choices[encoded_counts]
+            encoded_counts -= self._role_steps[role_index]
+            roles.append(ALL_ROLES[role_index])
+        roles.reverse()
+        return roles
+
+    def _add_player(self, player: Player, max_counts: RoleCounts | None) -> None:
+        base = self._base
+        role_losses = [
+            (role_step, role_index, 10 - proficiency)
+            for role_index, (proficiency, role_step) in enumerate(
+                zip(player.proficiencies, self._role_steps)
+            )
+        ]
+        next_losses: dict[int, int] = {}
+        player_choices: dict[int, int] = {}
+        for encoded_counts, loss in self._losses.items():
+            for role_step, role_index, role_loss in role_losses:
+                if max_counts is not None and (
+                    encoded_counts // role_step % base >= max_counts[role_index]
+                ):
+                    continue
+                next_counts = encoded_counts + role_step
+                next_loss = loss + role_loss
+                if next_loss < next_losses.get(next_counts, next_loss + 1):
+                    next_losses[next_counts] = next_loss
+                    player_choices[next_counts] = role_index
+        self._losses = next_losses
+        self._choices.append(player_choices)
+
+    def _encode(self, role_counts: RoleCounts) -> int:
+        return sum(
+            role_count * role_step
+            for role_count, role_step in zip(role_counts, self._role_steps)
+        )
+
+    def _decode(self, encoded_counts: int) -> RoleCounts:
+        role_counts = []
+        for _ in ALL_ROLES:
+            encoded_counts, role_count = divmod(encoded_counts, self._base)
+            role_counts.append(role_count)
+        return tuple(role_counts)
+
+
+class RoleAssignmentSolver:
+    """
+    Finds players' roles satisfying role picking rules with the minimal total
+    proficiency loss, where a loss of a player is the difference between
+    the main role proficiency and the chosen role proficiency.
+
+    Uses dynamic programming over players with role count vectors as states,
+    so the best assignment for every reachable vector is found in a single pass.
+    If no vector satisfies the rules, the one requiring the least swaps is used.
+    Among vectors with equal losses the ones with even role counts are preferred,
+    since they can be split between teams equally.
+    """
+
+    def __init__(self, rules: RolePickingRules) -> None:
+        self.rules = rules
+
+    def solve(self, players: list[Player]) -> list[PlayerRole]:
+        """Returns the best roles for players, in the players' order"""
+        table = RoleCountsTable(players)
+        self._feasible_table = self.rules.get_feasible_table(len(players))
+        best_counts, _ = min(
+            table.iter_losses(),
+            key=lambda counts_loss: self._get_vector_score(*counts_loss),
+        )
+        return table.restore_roles(best_counts)
+
+    def _get_vector_score(
+        self, role_counts: RoleCounts, loss: int
+    ) -> tuple[int, int, int]:
+        odd_roles_amount = sum(role_count % 2 for role_count in role_counts)
+        required_swaps = self._feasible_table.get_required_swaps_amount(role_counts)
+        return required_swaps, loss, odd_roles_amount
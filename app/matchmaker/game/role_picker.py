@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import logging
 
-from app.enums import PlayerRole
-from app.matchmaker.game.role_picker_rules import RolePickingRules
-from app.matchmaker.game.role_swap import RoleSwap, RoleSwapFactory
+from app.matchmaker.game.role_assignment import RoleAssignmentSolver
+from app.matchmaker.game.role_picker_rules import RoleCounts, RolePickingRules
+from app.matchmaker.game.role_swap import RoleSwapFactory
+from app.matchmaker.player import ALL_ROLES
 from app.matchmaker.player_pool import PlayerPool
 
 log = logging.getLogger(__name__)
@@ -33,52 +34,33 @@ class RolePicker:
     def set_player_roles(self) -> PlayerPool:
         """
         Sets the player roles.
-        Applies the best possible swaps until the rules are satisfied.
+        Solves the role assignment satisfying the rules with the minimal
+        proficiency loss and applies swaps required to reach it.
         """
-
-        while self._get_required_swaps_amount() != 0:
-            # re-creating swap list after each valuable swap since each player has a
-            # total of 2 swaps in a list, with 2nd one being irrelevant after the 1st
-            # one is applied
-            swaps = self._create_all_swaps()
-            for swap in swaps:
-                start_required_swaps = self._get_required_swaps_amount()
-                swap.apply()
-                result_required_swaps = self._get_required_swaps_amount()
-                if result_required_swaps >= start_required_swaps:
-                    swap.revert()
-                else:
-                    break
+        feasible_table = self.rules.get_feasible_table(len(self.players))
+        # main roles have no proficiency loss, so they are the best assignment
+        # whenever they satisfy the rules
+        if feasible_table.is_feasible(self._get_role_counts()) and not any(
+            player.is_offclass for player in self.players
+        ):
+            return self.players
+        solver = RoleAssignmentSolver(self.rules)
+        target_roles = solver.solve(self.players)
+        for player, target_role in zip(self.players, target_roles):
+            if player.current_role != target_role:
+                self.swap_factory(player, target_role).apply()
+        if self._get_required_swaps_amount() != 0:
+            log.warning(
+                "Can't satisfy role picking rules with the current players, "
+                "nearest feasible role counts are "
+                f"{feasible_table.get_target_role_counts(self._get_role_counts())}"
+            )
         return self.players
 
-    def _create_all_swaps(self) -> list[RoleSwap]:
-        """Creates all possible swaps of players, 24 in total"""
-        swaps = []
-        for player in self.players:
-            target_roles = self._swapping_targets_map[player.current_role]
-            swaps.append(self.swap_factory(player, target_roles[0]))
-            swaps.append(self.swap_factory(player, target_roles[1]))
-        swaps.sort(reverse=True)
-        return swaps
+    def _get_role_counts(self) -> RoleCounts:
+        return tuple(self.players.get_role_players_amount(role) for role in ALL_ROLES)
 
     def _get_required_swaps_amount(self) -> int:
         """Finds a sum of slots, required to get changed by the rules"""
-        result = 0
-        for role in PlayerRole:
-            role_max_limit_diff = (
-                self.players.get_role_players_amount(role)
-                - self.rules.max[role].boundary
-            )
-            result += role_max_limit_diff if role_max_limit_diff > 0 else 0
-
-            role_min_limit_diff = self.rules.min[
-                role
-            ].boundary - self.players.get_role_players_amount(role)
-            result += role_min_limit_diff if role_min_limit_diff > 0 else 0
-        return result
-
-    _swapping_targets_map = {
-        PlayerRole.cav: [PlayerRole.inf, PlayerRole.arch],
-        PlayerRole.inf: [PlayerRole.cav, PlayerRole.arch],
-        PlayerRole.arch: [PlayerRole.inf, PlayerRole.cav],
-    }
+        feasible_table = self.rules.get_feasible_table(len(self.players))
+        return feasible_table.get_required_swaps_amount(self._get_role_counts())
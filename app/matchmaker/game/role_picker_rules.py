@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import itertools
 from abc import ABC, abstractmethod
 
 from app.enums import PlayerRole
+from app.matchmaker.player import ALL_ROLES
 from app.matchmaker.player_pool import PlayerPool
 from app.matchmaking_config import ClassLimitations, Map, MatchmakingConfig
 
+# amounts of players of each role, ordered as ALL_ROLES
+RoleCounts = tuple[int, ...]
+
 
 class RoleLimitationRule(ABC):
     """
@@ -39,10 +44,94 @@ class RolePickingRules:
     def __init__(self) -> None:
         self.min = {}
         self.max = {}
+        self._feasible_tables: dict[int, FeasibleRoleCountsTable] = {}
 
     min: dict[PlayerRole, MinPlayersForClassRule]
     max: dict[PlayerRole, MaxPlayersForClassRule]
 
+    def get_feasible_table(self, players_amount: int) -> FeasibleRoleCountsTable:
+        """
+        Returns a lookup table of role count vectors for a given amount of
+        players, it's built on the first call. Rules must be populated
+        """
+        if players_amount not in self._feasible_tables:
+            self._feasible_tables[players_amount] = FeasibleRoleCountsTable(
+                self, players_amount
+            )
+        return self._feasible_tables[players_amount]
+
+    def get_required_swaps_amount(self, role_counts: dict[PlayerRole, int]) -> int:
+        """
+        Finds a sum of slots, required to get changed by the rules,
+        for given amounts of players of each role
+        """
+        result = 0
+        for role, role_players_amount in role_counts.items():
+            result += max(role_players_amount - self.max[role].boundary, 0)
+            result += max(self.min[role].boundary - role_players_amount, 0)
+        return result
+
+
+class FeasibleRoleCountsTable:
+    """
+    Precomputed answers of role picking rules for every role count vector of
+    a given amount of players: an amount of slots required to get changed,
+    the nearest feasible vector and an amount of swaps to reach it.
+    Vectors are ordered as ALL_ROLES, a swap moves a player between two roles
+    """
+
+    def __init__(self, rules: RolePickingRules, players_amount: int) -> None:
+        all_role_counts = [
+            role_counts
+            for role_counts in itertools.product(
+                range(players_amount + 1), repeat=len(ALL_ROLES)
+            )
+            if sum(role_counts) == players_amount
+        ]
+        self._required_swaps = {
+            role_counts: rules.get_required_swaps_amount(
+                dict(zip(ALL_ROLES, role_counts))
+            )
+            for role_counts in all_role_counts
+        }
+        self.feasible_role_counts = tuple(
+            role_counts
+            for role_counts in all_role_counts
+            if self._required_swaps[role_counts] == 0
+        )
+        self._targets: dict[RoleCounts, tuple[RoleCounts, int]] = {}
+        if self.feasible_role_counts:
+            for role_counts in all_role_counts:
+                self._targets[role_counts] = self._find_nearest(role_counts)
+
+    def get_required_swaps_amount(self, role_counts: RoleCounts) -> int:
+        return self._required_swaps[role_counts]
+
+    def is_feasible(self, role_counts: RoleCounts) -> bool:
+        return self._required_swaps[role_counts] == 0
+
+    def get_target_role_counts(self, role_counts: RoleCounts) -> RoleCounts | None:
+        """Returns the nearest feasible vector, None if there are none"""
+        target = self._targets.get(role_counts)
+        return None if target is None else target[0]
+
+    def get_swaps_to_target_amount(self, role_counts: RoleCounts) -> int | None:
+        """Returns an amount of swaps to the nearest feasible vector"""
+        target = self._targets.get(role_counts)
+        return None if target is None else target[1]
+
+    def _find_nearest(self, role_counts: RoleCounts) -> tuple[RoleCounts, int]:
+        swaps_amounts = (
+            sum(
+                abs(role_count - target_count)
+                for role_count, target_count in zip(role_counts, target_counts)
+            )
+            // 2
+            for target_counts in self.feasible_role_counts
+        )
+        swaps_amount, target_counts = min(zip(swaps_amounts, self.feasible_role_counts))
+        return target_counts, swaps_amount
+
 
 class MaxPlayersForClassRule(RoleLimitationRule):
     def check_players(self, players: PlayerPool) -> bool:
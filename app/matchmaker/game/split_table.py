@@ -0,0 +1,127 @@
+import itertools
+from functools import cached_property, lru_cache
+
+from app.enums import PlayerRole
+from app.matchmaker.game.team import Team
+from app.matchmaker.player import ALL_ROLES
+from app.matchmaker.player_pool import PlayerPool
+
+
+@lru_cache
+def get_canonical_combinations(players_amount: int) -> tuple[tuple[int, ...], ...]:
+    """
+    Returns team1 player indexes of all splits for a given amount of players,
+    skipping mirrored splits. Team1 of a canonical split always contains
+    the first player. Order matches the itertools.combinations one
+    """
+    team_size = players_amount // 2
+    return tuple(
+        combination
+        for combination in itertools.combinations(range(players_amount), team_size)
+        if combination[0] == 0
+    )
+
+
+@lru_cache
+def get_canonical_masks(players_amount: int) -> tuple[int, ...]:
+    """Returns canonical splits encoded as team1 bitmasks"""
+    return tuple(
+        sum(1 << index for index in combination)
+        for combination in get_canonical_combinations(players_amount)
+    )
+
+
+class SplitTable:
+    """
+    Precomputed data of all possible team splits of a player pool.
+    Each split is encoded as a bitmask of team1 players, bit N corresponds to the
+    N-th player of the pool. Mirrored splits are not enumerated.
+
+    Role counts and igl membership of a split are read from per-pool bitmasks,
+    mmr sums are precomputed once for every canonical split.
+    Per-split data is also available as columns ordered the same way as masks,
+    so rules can check all splits in a single batched call.
+    Team objects are only created on demand via create_teams.
+    Per-player data is read from the pool's columns.
+    """
+
+    def __init__(self, players: PlayerPool) -> None:
+        self.players = players
+        self.columns = players.columns
+        self.team_size = len(players) // 2
+        self.masks = get_canonical_masks(len(players))
+        self.role_masks = {
+            role: self._get_role_mask(role_index)
+            for role_index, role in enumerate(ALL_ROLES)
+        }
+        self.role_totals = {
+            role: mask.bit_count() for role, mask in self.role_masks.items()
+        }
+        self.best_igls_mask = self._get_best_igls_mask()
+        self.total_mmr = sum(self.columns.mmr_raw)
+        self.mmr_sums = self._get_mmr_sums()
+        self._role_counts: dict[PlayerRole, list[int]] = {}
+
+    def count_role(self, mask: int, role: PlayerRole) -> int:
+        """Returns an amount of team1 players of a given role"""
+        return (mask & self.role_masks[role]).bit_count()
+
+    def get_role_counts(self, role: PlayerRole) -> list[int]:
+        """Returns team1 role players amount of every split, ordered as masks"""
+        if role not in self._role_counts:
+            role_mask = self.role_masks[role]
+            self._role_counts[role] = [
+                (mask & role_mask).bit_count() for mask in self.masks
+            ]
+        return self._role_counts[role]
+
+    @cached_property
+    def mmr_diffs(self) -> list[float]:
+        """Avg mmr differences of teams of every split, ordered as masks"""
+        total_mmr = self.total_mmr
+        team_size = self.team_size
+        return [
+            abs(total_mmr - team1_mmr * 2) / team_size for team1_mmr in self.mmr_sums
+        ]
+
+    def get_mmr_diff(self, split_index: int) -> float:
+        """Returns an avg mmr difference of teams for a split with a given index"""
+        team1_mmr = self.mmr_sums[split_index]
+        team2_mmr = self.total_mmr - team1_mmr
+        return abs(team1_mmr - team2_mmr) / self.team_size
+
+    def create_teams(self, mask: int) -> tuple[Team, Team]:
+        """Builds team objects for a split, preserving the pool's players order"""
+        team1_players = []
+        team2_players = []
+        for index, player in enumerate(self.players):
+            if mask >> index & 1:
+                team1_players.append(player)
+            else:
+                team2_players.append(player)
+        return Team(team1_players, self.team_size), Team(team2_players, self.team_size)
+
+    def _get_role_mask(self, role_index: int) -> int:
+        mask = 0
+        for index, player_role_index in enumerate(self.columns.current_roles):
+            if player_role_index == role_index:
+                mask |= 1 << index
+        return mask
+
+    def _get_best_igls_mask(self) -> int | None:
+        """
+        Returns a mask of 2 igls with the highest mmr,
+        None if pool has less than 2 igls
+        """
+        igl_indexes = [index for index, igl in enumerate(self.columns.igl) if igl]
+        if len(igl_indexes) < 2:
+            return None
+        igl_indexes.sort(key=self.columns.mmr.__getitem__, reverse=True)
+        return (1 << igl_indexes[0]) | (1 << igl_indexes[1])
+
+    def _get_mmr_sums(self) -> list[int]:
+        players_mmr = self.columns.mmr_raw
+        return [
+            sum(players_mmr[index] for index in combination)
+            for combination in get_canonical_combinations(len(self.players))
+        ]
@@ -1,51 +1,128 @@
+from collections.abc import Iterable
+from typing import Any, SupportsIndex
+
 from app.enums import PlayerRole
-from app.matchmaker.player import Player
+from app.matchmaker.player import ALL_ROLES, Player
+from app.matchmaker.player_pool import DEFAULT_TEAM_SIZE
 
 
 class Team(list):
-    def __init__(self, players: list[Player]) -> None:
+    """
+    A list of team players with aggregates, used by balancer rules and
+    converters. Mmr sum, role counts and igls amount are computed once on
+    construction and updated on every roster change, so reading them is O(1).
+    Aggregates use players' roles at the moment they joined the team.
+    """
+
+    __slots__ = ("_mmr_raw_sum", "_role_counts", "_igls_amount")
+
+    def __init__(
+        self, players: list[Player], team_size: int = DEFAULT_TEAM_SIZE
+    ) -> None:
         super().__init__()
         team_length = len(players)
-        if team_length != 6:
+        if team_length != team_size:
             raise ValueError(
-                f"There should be 6 players passed to the team "
+                f"There should be {team_size} players passed to the team "
                 f"constructor, got {team_length} instead"
             )
-        self += players
+        super().extend(players)
+        self._recount_aggregates()
 
     @property
     def avg_mmr(self) -> float:
-        total_mmr = sum([player.mmr_raw for player in self])
-        avg_mmr = total_mmr / 6
-        return avg_mmr
+        return self._mmr_raw_sum / len(self)
 
     @property
     def total_cav(self) -> int:
-        return self._count_players_by_role(PlayerRole.cav)
+        return self._role_counts[PlayerRole.cav]
 
     @property
     def total_inf(self) -> int:
-        return self._count_players_by_role(PlayerRole.inf)
+        return self._role_counts[PlayerRole.inf]
 
     @property
     def total_arch(self) -> int:
-        return self._count_players_by_role(PlayerRole.arch)
+        return self._role_counts[PlayerRole.arch]
 
     @property
     def has_igl(self) -> bool:
-        return any([player.igl for player in self])
+        return self._igls_amount > 0
 
     def get_igl(self) -> Player:
-        all_igls = [player for player in self if player.igl]
-        if not all_igls:
-            all_igls = [
+        if self.has_igl:
+            candidates = (player for player in self if player.igl)
+        else:
+            candidates = (
                 player for player in self if player.current_role == PlayerRole.inf
-            ]
-        all_igls.sort(key=lambda player: player.mmr, reverse=True)
-        try:
-            return all_igls[0]
-        except IndexError:
+            )
+        igl = max(candidates, key=lambda player: player.mmr, default=None)
+        if igl is None:
             raise ValueError("Team has no infantry and no igls")
+        return igl
+
+    def append(self, player: Player) -> None:
+        super().append(player)
+        self._add_to_aggregates(player)
+
+    def extend(self, players: Iterable[Player]) -> None:
+        players = list(players)
+        super().extend(players)
+        for player in players:
+            self._add_to_aggregates(player)
+
+    def __iadd__(self, players: Iterable[Any]) -> "Team":  # type: ignore[misc]
+        self.extend(players)
+        return self
+
+    def insert(self, index: SupportsIndex, player: Player) -> None:
+        super().insert(index, player)
+        self._add_to_aggregates(player)
+
+    def remove(self, player: Player) -> None:
+        super().remove(player)
+        self._remove_from_aggregates(player)
+
+    def pop(self, index: SupportsIndex = -1) -> Player:
+        player = super().pop(index)
+        self._remove_from_aggregates(player)
+        return player
+
+    def clear(self) -> None:
+        super().clear()
+        self._reset_aggregates()
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        super().__setitem__(key, value)
+        self._recount_aggregates()
+
+    def __delitem__(self, key: Any) -> None:
+        super().__delitem__(key)
+        self._recount_aggregates()
+
+    def _add_to_aggregates(self, player: Player) -> None:
+        self._mmr_raw_sum += player.mmr_raw
+        self._role_counts[player.current_role] += 1
+        self._igls_amount += player.igl
+
+    def _remove_from_aggregates(self, player: Player) -> None:
+        self._mmr_raw_sum -= player.mmr_raw
+        self._role_counts[player.current_role] -= 1
+        self._igls_amount -= player.igl
+
+    def _reset_aggregates(self) -> None:
+        self._mmr_raw_sum = 0
+        self._role_counts = dict.fromkeys(ALL_ROLES, 0)
+        self._igls_amount = 0
 
-    def _count_players_by_role(self, target_role: PlayerRole) -> int:
-        return len(list(filter((lambda p: p.current_role == target_role), self)))
+    def _recount_aggregates(self) -> None:
+        role_counts = dict.fromkeys(ALL_ROLES, 0)
+        mmr_raw_sum = 0
+        igls_amount = 0
+        for player in self:
+            role_counts[player.current_role] += 1
+            mmr_raw_sum += player.mmr_raw
+            igls_amount += player.igl
+        self._role_counts = role_counts
+        self._mmr_raw_sum = mmr_raw_sum
+        self._igls_amount = igls_amount
@@ -0,0 +1,131 @@
+from collections.abc import Sequence
+
+from app.matchmaker.game.role_picker_rules import FeasibleRoleCountsTable
+from app.matchmaker.player import ALL_ROLES, ROLE_INDEXES, Player
+
+PlayerGroups = list[list[Player]]
+
+
+class LobbyPartitioner:
+    """
+    Splits a whole queue into lobbies and picks players sitting out at once.
+
+    Players are sorted by mmr, every lobby is a contiguous window of sorted
+    players and players sitting out are the ones between windows, which is
+    optimal for the sum of lobbies' mmr spreads. Windows are chosen with
+    dynamic programming over the sorted players and the amount of players
+    sitting out so far, minimizing the sum of lobbies' costs.
+
+    A lobby costs its mmr spread plus role_swap_penalty per role swap its
+    players' main roles need to satisfy role limits of the lobby. role_tables
+    holds a feasible role counts table per lobby, ordered by mmr; if it's empty,
+    roles are ignored. Sitting out costs are added for every player sitting
+    out, they are ordered as passed players. Works in O(N log N + N * game_size).
+    """
+
+    def __init__(
+        self,
+        game_size: int,
+        role_tables: Sequence[FeasibleRoleCountsTable] = (),
+        role_swap_penalty: float = 0,
+    ) -> None:
+        self.game_size = game_size
+        self.role_tables = role_tables
+        self.role_swap_penalty = role_swap_penalty
+
+    def partition(
+        self, players: list[Player], sit_out_costs: Sequence[float] | None = None
+    ) -> tuple[PlayerGroups, list[Player]]:
+        """Returns lobby player groups, ordered by mmr, and players sitting out"""
+        order = sorted(range(len(players)), key=lambda index: players[index].mmr_raw)
+        sorted_players = [players[index] for index in order]
+        if sit_out_costs is None:
+            self._sit_out_costs = [0.0] * len(players)
+        else:
+            self._sit_out_costs = [sit_out_costs[index] for index in order]
+        self._mmrs = [player.mmr_raw for player in sorted_players]
+        self._role_prefixes = self._get_role_prefixes(sorted_players)
+        excluded_amount = len(players) % self.game_size
+        choices = self._find_windows(len(players), excluded_amount)
+        return self._restore_groups(sorted_players, excluded_amount, choices)
+
+    def _find_windows(
+        self, players_amount: int, excluded_amount: int
+    ) -> list[list[bool]]:
+        """
+        costs[i][k] is the lowest cost of the first i players with k of them
+        sitting out, choices[i][k] tells whether the i-th player ends a lobby
+        in the best option of this state. Players sitting out are always less
+        than a lobby, so a lobby ending at the i-th player has a single
+        possible amount of players sitting out before it
+        """
+        infinity = float("inf")
+        costs = [[infinity] * (excluded_amount + 1) for _ in range(players_amount + 1)]
+        choices = [[False] * (excluded_amount + 1) for _ in range(players_amount + 1)]
+        costs[0][0] = 0
+        for players_end in range(1, players_amount + 1):
+            end_costs = costs[players_end]
+            previous_costs = costs[players_end - 1]
+            sit_out_cost = self._sit_out_costs[players_end - 1]
+            for excluded in range(1, min(excluded_amount, players_end) + 1):
+                end_costs[excluded] = previous_costs[excluded - 1] + sit_out_cost
+            window_start = players_end - self.game_size
+            if window_start < 0:
+                continue
+            lobby_index, excluded = divmod(window_start, self.game_size)
+            if excluded > excluded_amount or costs[window_start][excluded] == infinity:
+                continue
+            cost = costs[window_start][excluded] + self._get_lobby_cost(
+                window_start, lobby_index
+            )
+            if cost < end_costs[excluded]:
+                end_costs[excluded] = cost
+                choices[players_end][excluded] = True
+        return choices
+
+    def _get_lobby_cost(self, window_start: int, lobby_index: int) -> float:
+        window_end = window_start + self.game_size
+        cost: float = self._mmrs[window_end - 1] - self._mmrs[window_start]
+        if self.role_tables:
+            role_counts = tuple(
+                role_prefix[window_end] - role_prefix[window_start]
+                for role_prefix in self._role_prefixes
+            )
+            role_table = self.role_tables[lobby_index]
+            swaps_amount = role_table.get_swaps_to_target_amount(role_counts)
+            if swaps_amount is not None:
+                cost += self.role_swap_penalty * swaps_amount
+        return cost
+
+    @staticmethod
+    def _get_role_prefixes(players: list[Player]) -> list[list[int]]:
+        """role_prefixes[r][i] is an amount of the first i players of r main role"""
+        role_prefixes = [[0] for _ in ALL_ROLES]
+        for player in players:
+            main_role_index = ROLE_INDEXES[player.main]
+            for role_index, role_prefix in enumerate(role_prefixes):
+                role_prefix.append(role_prefix[-1] + (role_index == main_role_index))
+        return role_prefixes
+
+    def _restore_groups(
+        self,
+        sorted_players: list[Player],
+        excluded_amount: int,
+        choices: list[list[bool]],
+    ) -> tuple[PlayerGroups, list[Player]]:
+        groups: PlayerGroups = []
+        excluded_players: list[Player] = []
+        players_end = len(sorted_players)
+        excluded = excluded_amount
+        while players_end > 0:
+            if choices[players_end][excluded]:
+                window_start = players_end - self.game_size
+                groups.append(sorted_players[window_start:players_end])
+                players_end = window_start
+            else:
+                excluded_players.append(sorted_players[players_end - 1])
+                players_end -= 1
+                excluded -= 1
+        groups.reverse()
+        excluded_players.reverse()
+        return groups, excluded_players
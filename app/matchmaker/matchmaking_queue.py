@@ -0,0 +1,157 @@
+import bisect
+import time
+from collections.abc import Callable, Sequence
+
+from app.exceptions import PlayerAlreadyQueuedError
+from app.matchmaker.lobby_partitioner import PlayerGroups
+from app.matchmaker.player import Player
+from app.matchmaker.player_pool import DEFAULT_TEAM_SIZE
+
+
+class MmrWindowSchedule:
+    """
+    Biggest mmr spread of a lobby a player accepts, widening with the time
+    the player waits. steps are (wait seconds, max mmr spread) pairs, a player
+    waiting less than the first step accepts the first step's spread.
+    Without steps any spread is accepted
+    """
+
+    def __init__(self, steps: Sequence[tuple[float, float]] = ()) -> None:
+        sorted_steps = sorted(steps)
+        self._wait_times = [wait_time for wait_time, _ in sorted_steps]
+        self._max_spreads = [max_spread for _, max_spread in sorted_steps]
+
+    def get_max_spread(self, wait_time: float) -> float:
+        if not self._max_spreads:
+            return float("inf")
+        step_index = bisect.bisect_right(self._wait_times, wait_time) - 1
+        return self._max_spreads[max(step_index, 0)]
+
+
+class MatchmakingQueue:
+    """
+    Players waiting for a game, kept between matchmaking calls.
+
+    Players are indexed by id and kept sorted by mmr_raw, both indexes are
+    updated on every join and leave with a binary search, so the queue is never
+    resorted. A lobby is formed of game_size players with contiguous mmr, which
+    mmr spread is accepted by every one of them according to window_schedule.
+
+    On every tick players are visited from the longest waiting one, candidates
+    for a player's lobby are found by a binary search of the mmr range the player
+    accepts, so players with too few candidates are skipped in O(log N). Among
+    lobbies including the player the one with the lowest mmr spread is formed.
+    """
+
+    def __init__(
+        self,
+        team_size: int = DEFAULT_TEAM_SIZE,
+        window_schedule: MmrWindowSchedule | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.team_size = team_size
+        self.window_schedule = window_schedule or MmrWindowSchedule()
+        self.clock = clock
+        # sorted by mmr_raw, players of equal mmr are kept in joining order
+        self._mmrs: list[int] = []
+        self._players: list[Player] = []
+        self._players_by_id: dict[str, Player] = {}
+        # ordered by joining time
+        self._join_times: dict[str, float] = {}
+
+    @property
+    def game_size(self) -> int:
+        return self.team_size * 2
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def __contains__(self, player_id: object) -> bool:
+        return player_id in self._players_by_id
+
+    def join(self, player: Player) -> None:
+        """Raises PlayerAlreadyQueuedError if a player with the same id is queued"""
+        if player.id in self._players_by_id:
+            raise PlayerAlreadyQueuedError(f"Player {player.id} is already queued")
+        index = bisect.bisect_right(self._mmrs, player.mmr_raw)
+        self._mmrs.insert(index, player.mmr_raw)
+        self._players.insert(index, player)
+        self._players_by_id[player.id] = player
+        self._join_times[player.id] = self.clock()
+
+    def leave(self, player_id: str) -> Player | None:
+        """Removes a player from the queue, returns None if it's not queued"""
+        player = self._players_by_id.get(player_id)
+        if player is not None:
+            self._remove(player)
+        return player
+
+    def get_players(self) -> list[Player]:
+        """Returns queued players sorted by mmr"""
+        return list(self._players)
+
+    def tick(self) -> PlayerGroups:
+        """
+        Forms lobbies from queued players and removes them from the queue.
+        Sets players' queue_time to the time they waited
+        """
+        now = self.clock()
+        lobbies: PlayerGroups = []
+        for player_id in list(self._join_times):
+            player = self._players_by_id.get(player_id)
+            if player is None:
+                continue
+            lobby = self._find_lobby(player, now)
+            if lobby is None:
+                continue
+            for lobby_player in lobby:
+                lobby_player.queue_time = now - self._remove(lobby_player)
+            lobbies.append(lobby)
+        return lobbies
+
+    def _find_lobby(self, player: Player, now: float) -> list[Player] | None:
+        """Returns the lowest mmr spread lobby including a player, if any"""
+        game_size = self.game_size
+        max_spread = self._get_max_spread(player, now)
+        candidates_start = bisect.bisect_left(self._mmrs, player.mmr_raw - max_spread)
+        candidates_end = bisect.bisect_right(self._mmrs, player.mmr_raw + max_spread)
+        if candidates_end - candidates_start < game_size:
+            return None
+        player_index = self._find_index(player)
+        window_starts = range(
+            max(candidates_start, player_index - game_size + 1),
+            min(player_index, candidates_end - game_size) + 1,
+        )
+        for window_start in sorted(window_starts, key=self._get_window_spread):
+            mmr_spread = self._get_window_spread(window_start)
+            if mmr_spread > max_spread:
+                break
+            lobby = self._players[window_start : window_start + game_size]
+            if all(
+                mmr_spread <= self._get_max_spread(lobby_player, now)
+                for lobby_player in lobby
+            ):
+                return lobby
+        return None
+
+    def _get_window_spread(self, window_start: int) -> int:
+        return self._mmrs[window_start + self.game_size - 1] - self._mmrs[window_start]
+
+    def _get_max_spread(self, player: Player, now: float) -> float:
+        wait_time = now - self._join_times[player.id]
+        return self.window_schedule.get_max_spread(wait_time)
+
+    def _remove(self, player: Player) -> float:
+        """Removes a player from the indexes and returns the joining time"""
+        index = self._find_index(player)
+        del self._mmrs[index]
+        del self._players[index]
+        del self._players_by_id[player.id]
+        return self._join_times.pop(player.id)
+
+    def _find_index(self, player: Player) -> int:
+        """Finds a player among the ones of the same mmr"""
+        index = bisect.bisect_left(self._mmrs, player.mmr_raw)
+        while self._players[index] is not player:
+            index += 1
+        return index
@@ -1,11 +1,15 @@
 import logging
+import weakref
+from collections.abc import Callable
 from typing import Any
 
-from app.enums import PlayerRole
+from app.enums import PatreonRole, PlayerRole
 from app.exceptions import ProficiencyValidationError, RoleNotFoundError
 
 log = logging.getLogger(__name__)
 
+RoleObserver = Callable[["Player", PlayerRole], None]
+
 
 class RoleProficiency(dict):
     def __init__(self, cav: int, arch: int, inf: int):
@@ -30,32 +34,105 @@ class RoleProficiency(dict):
             )
 
 
+# roles in the order of players' proficiencies tuples
+ALL_ROLES = tuple(PlayerRole)
+ROLE_INDEXES = {role: index for index, role in enumerate(ALL_ROLES)}
+# a compact picklable player: id, igl, mmr, proficiencies, patreon,
+# queue time and times excluded
+PlayerRecord = tuple[str, bool, int, tuple[int, ...], PatreonRole, float, int]
+
+
 class Player:
+    """
+    A matchmaking player. Proficiencies are kept as a tuple ordered as
+    ALL_ROLES and the main role is resolved once, when proficiencies are set,
+    so reading roles, proficiencies and mmr doesn't scan them.
+    """
+
+    __slots__ = (
+        "nickname",
+        "id",
+        "igl",
+        "mmr_raw",
+        "proficiencies",
+        "is_assigned_igl",
+        "patreon",
+        "queue_time",
+        "times_excluded",
+        "_main",
+        "_current_role",
+        "_role_observers",
+    )
+
     def __init__(
         self,
         id: str,
         igl: bool,
         mmr: int,
         role_proficiency: RoleProficiency,
+        patreon: PatreonRole = PatreonRole.patreon_0,
+        queue_time: float = 0,
+        times_excluded: int = 0,
     ) -> None:
         self.nickname = id
         self.id = id
         self.igl = igl
         self.mmr_raw = mmr
         self._role_proficiency = role_proficiency
-        self.current_role = self.main
+        self._role_observers: list[weakref.WeakMethod] = []
+        self._current_role = self._main
         self.is_assigned_igl = False
+        self.patreon = patreon
+        # seconds spent in the queue and amount of games the player sat out,
+        # both are used to prioritize players when some of them sit out
+        self.queue_time = queue_time
+        self.times_excluded = times_excluded
 
-    def get_role_proficiency(self, role: PlayerRole):
-        return self._role_proficiency[role]
+    @property
+    def _role_proficiency(self) -> RoleProficiency:
+        return RoleProficiency(
+            **{
+                role.name: proficiency
+                for role, proficiency in zip(ALL_ROLES, self.proficiencies)
+            }
+        )
+
+    @_role_proficiency.setter
+    def _role_proficiency(self, role_proficiency: RoleProficiency) -> None:
+        self.proficiencies: tuple[int, ...] = tuple(
+            role_proficiency[role] for role in ALL_ROLES
+        )
+        self._main = self._find_role_by_proficiency(10)
+
+    @property
+    def current_role(self) -> PlayerRole:
+        return self._current_role
+
+    @current_role.setter
+    def current_role(self, role: PlayerRole) -> None:
+        previous_role = self._current_role
+        self._current_role = role
+        if role is not previous_role:
+            self._notify_role_observers(previous_role)
+
+    def add_role_observer(self, observer: RoleObserver) -> None:
+        """
+        Subscribes a bound method to current role changes. It's called with
+        the player and the previous role. Observers are referenced weakly,
+        so subscribing doesn't keep their owners alive
+        """
+        self._role_observers.append(weakref.WeakMethod(observer))
+
+    def get_role_proficiency(self, role: PlayerRole) -> int:
+        return self.proficiencies[ROLE_INDEXES[role]]
 
     @property
     def is_offclass(self) -> bool:
-        return self.main != self.current_role
+        return self._main is not self._current_role
 
     @property
     def current_proficiency(self) -> int:
-        return self.get_role_proficiency(self.current_role)
+        return self.proficiencies[ROLE_INDEXES[self._current_role]]
 
     @property
     def mmr_reduced(self) -> int:
@@ -63,11 +140,36 @@ class Player:
 
     @property
     def mmr(self) -> int:
-        return self.mmr_raw if self.current_role == self.main else self.mmr_reduced
+        if self._current_role is self._main:
+            return self.mmr_raw
+        return self.mmr_raw - 10
 
     @property
     def main(self) -> PlayerRole:
-        return self._find_role_by_proficiency(10)
+        return self._main
+
+    def export_record(self) -> PlayerRecord:
+        """Returns a record to pass the player to other processes"""
+        return (
+            self.id,
+            self.igl,
+            self.mmr_raw,
+            self.proficiencies,
+            self.patreon,
+            self.queue_time,
+            self.times_excluded,
+        )
+
+    @classmethod
+    def from_record(cls, record: PlayerRecord) -> "Player":
+        id, igl, mmr, proficiencies, patreon, queue_time, times_excluded = record
+        role_proficiency = RoleProficiency(
+            **{
+                role.name: proficiency
+                for role, proficiency in zip(ALL_ROLES, proficiencies)
+            }
+        )
+        return cls(id, igl, mmr, role_proficiency, patreon, queue_time, times_excluded)
 
     def export_dict(self) -> dict:
         result: dict[str, Any] = {}
@@ -80,11 +182,20 @@ class Player:
         return result
 
     def __repr__(self):
-        return str(self.export_dict)
+        return str(self.export_dict())
 
     def __post_init__(self) -> None:
         self.current_role = self.main
 
+    def _notify_role_observers(self, previous_role: PlayerRole) -> None:
+        alive_observers = []
+        for observer_ref in self._role_observers:
+            observer = observer_ref()
+            if observer is not None:
+                observer(self, previous_role)
+                alive_observers.append(observer_ref)
+        self._role_observers = alive_observers
+
     def _find_role_by_proficiency(self, proficiency: int) -> PlayerRole:
         all_matching_roles = self._find_roles_by_proficiency(proficiency)
         try:
@@ -94,7 +205,7 @@ class Player:
 
     def _find_roles_by_proficiency(self, proficiency: int) -> list[PlayerRole]:
         result = []
-        for game_class in self._role_proficiency:
-            if self._role_proficiency[game_class] == proficiency:
+        for game_class, class_proficiency in zip(ALL_ROLES, self.proficiencies):
+            if class_proficiency == proficiency:
                 result.append(game_class)
         return result
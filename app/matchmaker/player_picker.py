@@ -1,29 +1,58 @@
+import heapq
 import random
-from copy import copy
 from dataclasses import dataclass, field
 
+from app.enums import PatreonRole
 from app.exceptions import NotEnoughPlayersError
+from app.matchmaker.game.role_picker_rules import FeasibleRoleCountsTable
+from app.matchmaker.lobby_partitioner import LobbyPartitioner, PlayerGroups
 from app.matchmaker.player import Player
-from app.matchmaker.player_pool import PlayerPool
+from app.matchmaker.player_pool import DEFAULT_TEAM_SIZE, PlayerPool
+
+PATREON_TIERS = {patreon: tier for tier, patreon in enumerate(PatreonRole)}
 
 
 @dataclass
 class PlayerPicker:
+    """
+    Picks players sitting out and groups the rest into games with
+    a LobbyPartitioner. role_tables are feasible role counts tables of games,
+    ordered by games' mmr, role_swap_penalty is passed to the partitioner.
+
+    Players are ranked by priority: patreon tier, time in the queue and times
+    they sat out before, ties are broken randomly. If sit_out_penalty is None,
+    surplus players with the lowest priority always sit out. Otherwise they sit
+    out for free and any other player costs sit_out_penalty per rank above them,
+    so the partitioner only trades priority for mmr spread when it's worth it.
+    """
+
     player_list: list[Player]
+    team_size: int = DEFAULT_TEAM_SIZE
+    role_tables: list[FeasibleRoleCountsTable] = field(default_factory=list)
+    role_swap_penalty: float = 0
+    sit_out_penalty: float | None = None
+    rng: random.Random = field(default_factory=random.Random)
     excluded_players: list[Player] = field(init=False)
     enrolled_players: list[Player] = field(init=False)
+    player_groups: PlayerGroups = field(init=False)
 
     def __post_init__(self):
-        if len(self.player_list) < 12:
-            raise NotEnoughPlayersError
+        if len(self.player_list) < self.game_size:
+            raise NotEnoughPlayersError(
+                f"There should be at least {self.game_size} players to create a game"
+            )
+
+    @property
+    def game_size(self) -> int:
+        return self.team_size * 2
 
     @property
     def game_slots_amount(self) -> int:
-        return self.games_amount * 4
+        return self.games_amount * self.game_size
 
     @property
     def games_amount(self) -> int:
-        return len(self.player_list) // 12
+        return len(self.player_list) // self.game_size
 
     @property
     def excluded_players_amount(self) -> int:
@@ -35,23 +64,55 @@ class PlayerPicker:
         Sets excluded_players and enrolled_players instance variables and returns
         enrolled players list
         """
-        input_players = copy(self.player_list)
-        excluded_players = []
-        for _ in range(self.excluded_players_amount):
-            excluded_player = random.choice(input_players)
-            excluded_players.append(excluded_player)
-            input_players.remove(excluded_player)
+        partitioner = LobbyPartitioner(
+            self.game_size, self.role_tables, self.role_swap_penalty
+        )
+        if self.sit_out_penalty is None:
+            self.excluded_players = self._get_lowest_priority_players()
+            excluded_ids = {id(player) for player in self.excluded_players}
+            self.player_groups, _ = partitioner.partition(
+                [
+                    player
+                    for player in self.player_list
+                    if id(player) not in excluded_ids
+                ]
+            )
+        else:
+            self.player_groups, self.excluded_players = partitioner.partition(
+                self.player_list, self._get_sit_out_costs(self.sit_out_penalty)
+            )
+        self.enrolled_players = [
+            player for player_group in self.player_groups for player in player_group
+        ]
+        return self.enrolled_players
+
+    def _get_priority(self, player: Player) -> tuple[int, float, int, float]:
+        return (
+            PATREON_TIERS[player.patreon],
+            player.queue_time,
+            player.times_excluded,
+            self.rng.random(),
+        )
+
+    def _get_lowest_priority_players(self) -> list[Player]:
+        return heapq.nsmallest(
+            self.excluded_players_amount, self.player_list, key=self._get_priority
+        )
 
-        self.excluded_players = excluded_players
-        self.enrolled_players = input_players
-        return input_players
+    def _get_sit_out_costs(self, sit_out_penalty: float) -> list[float]:
+        """Returns sitting out costs ordered as the player list"""
+        priorities = [self._get_priority(player) for player in self.player_list]
+        ranked_indexes = sorted(
+            range(len(self.player_list)), key=priorities.__getitem__
+        )
+        excluded_amount = self.excluded_players_amount
+        sit_out_costs = [0.0] * len(self.player_list)
+        for rank, index in enumerate(ranked_indexes[excluded_amount:], start=1):
+            sit_out_costs[index] = sit_out_penalty * rank
+        return sit_out_costs
 
     def split_into_games(self) -> list[PlayerPool]:
-        result = []
-        enrolled_players = self.enrolled_players
-        enrolled_players.sort(key=(lambda player: player.mmr_raw))
-        for game in range(self.games_amount):
-            player_group = enrolled_players[game * 12 : (game + 1) * 12]
-            player_pool = PlayerPool(player_group)
-            result.append(player_pool)
-        return result
+        return [
+            PlayerPool(player_group, self.team_size)
+            for player_group in self.player_groups
+        ]
@@ -1,37 +1,117 @@
+from dataclasses import dataclass
+
 from app.enums import PlayerRole
-from app.matchmaker.player import Player
+from app.matchmaker.player import ALL_ROLES, ROLE_INDEXES, Player
+
+DEFAULT_TEAM_SIZE = 6
+
+
+@dataclass(frozen=True)
+class PlayerColumns:
+    """
+    Struct-of-arrays view of a player pool, every column is ordered as
+    the pool's players. Roles are stored as indexes of ALL_ROLES,
+    proficiencies[role_index] is a column of players' role proficiencies
+    """
+
+    mmr_raw: tuple[int, ...]
+    mmr: tuple[int, ...]
+    igl: tuple[bool, ...]
+    main_roles: tuple[int, ...]
+    current_roles: tuple[int, ...]
+    proficiencies: tuple[tuple[int, ...], ...]
+
+    @classmethod
+    def from_players(cls, players: list[Player]) -> "PlayerColumns":
+        return cls(
+            mmr_raw=tuple(player.mmr_raw for player in players),
+            mmr=tuple(player.mmr for player in players),
+            igl=tuple(player.igl for player in players),
+            main_roles=tuple(ROLE_INDEXES[player.main] for player in players),
+            current_roles=tuple(
+                ROLE_INDEXES[player.current_role] for player in players
+            ),
+            proficiencies=tuple(zip(*(player.proficiencies for player in players))),
+        )
 
 
 class PlayerPool(list):
-    def __init__(self, players: list[Player]):
+    """
+    A list of players of a single game. Role counts and mmr sums are counted
+    once on construction and updated whenever a player's current role changes,
+    so role amounts, avg mmr and mmr deviation are O(1).
+    The pool is not meant to be mutated after construction.
+
+    columns is a struct-of-arrays view of players for engines working with
+    the whole pool at once, it's built on demand and rebuilt after role changes.
+    """
+
+    def __init__(self, players: list[Player], team_size: int = DEFAULT_TEAM_SIZE):
         super().__init__()
+        self.team_size = team_size
         self += players
         self.check_pool_validity()
+        self._count_aggregates()
+        self._columns: PlayerColumns | None = None
+        for player in self:
+            player.add_role_observer(self._on_player_role_changed)
+
+    @property
+    def pool_size(self) -> int:
+        return self.team_size * 2
+
+    @property
+    def columns(self) -> PlayerColumns:
+        if self._columns is None:
+            self._columns = PlayerColumns.from_players(self)
+        return self._columns
 
     def check_pool_validity(self) -> None:
-        if len(self) != 12:
+        if len(self) != self.pool_size:
             raise ValueError(
-                f"There should be 12 players in player pool, got {len(self)} instead"
+                f"There should be {self.pool_size} players in player pool, "
+                f"got {len(self)} instead"
             )
         for player in self:
             if not self.count(player) == 1:
                 raise ValueError("PlayerPool has duplicating players")
 
     def get_role_players_amount(self, role: PlayerRole) -> int:
-        return len([player for player in self if player.current_role == role])
+        return self._role_counts[role]
 
     def check_odd_role_players_amount(self, role: PlayerRole) -> bool:
         return True if self.get_role_players_amount(role) % 2 == 1 else False
 
     @property
-    def avg_mmr(self):
-        total_mmr = sum([player.mmr for player in self])
-        avg_mmr = total_mmr / 12
-        return avg_mmr
+    def avg_mmr(self) -> float:
+        return self._mmr_sum / len(self)
 
     @property
-    def mmr_deviation(self):
-        dev_squares_sum = 0
+    def mmr_deviation(self) -> float:
+        # n^2 * variance is an exact integer, so no precision is lost
+        # on subtracting the squared sum
+        players_amount = len(self)
+        scaled_variance = players_amount * self._mmr_squares_sum - self._mmr_sum**2
+        return scaled_variance**0.5 / players_amount
+
+    def _count_aggregates(self) -> None:
+        self._role_counts = dict.fromkeys(ALL_ROLES, 0)
+        self._mmr_sum = 0
+        self._mmr_squares_sum = 0
         for player in self:
-            dev_squares_sum += (self.avg_mmr - player.mmr) ** 2
-        return (dev_squares_sum / len(self)) ** 0.5
+            self._role_counts[player.current_role] += 1
+            self._mmr_sum += player.mmr
+            self._mmr_squares_sum += player.mmr**2
+
+    def _on_player_role_changed(
+        self, player: Player, previous_role: PlayerRole
+    ) -> None:
+        self._columns = None
+        self._role_counts[previous_role] -= 1
+        self._role_counts[player.current_role] += 1
+        # mmr depends on whether the player plays the main role
+        previous_mmr = (
+            player.mmr_raw if previous_role == player.main else player.mmr_reduced
+        )
+        self._mmr_sum += player.mmr - previous_mmr
+        self._mmr_squares_sum += player.mmr**2 - previous_mmr**2
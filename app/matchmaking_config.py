@@ -55,14 +55,52 @@ class Roles(BaseModel):
     swap_priority: list[SwapCategory] = []
 
 
+class MmrWindow(BaseModel):
+    wait_seconds: float
+    max_mmr_spread: int
+
+
 class MatchmakingConfig(BaseModel):
     map_types: dict[MapTypeEnum, MapType]
     maps: list[Map]
     factions: list[Faction]
     roles: Roles
+    team_size: int = 6
+    # per-lobby team balancing time budget in seconds, unlimited if not set
+    balance_time_budget: float | None = None
+    # amount of runner-up team splits returned along with the best one
+    alternative_splits_amount: int = 0
+    # choose roles and teams in a single search instead of picking roles first,
+    # alternative splits are not returned for jointly balanced games
+    joint_role_balancing: bool = False
+    # avg mmr difference worth a single point of offclass proficiency loss
+    offclass_penalty: float = 5.0
+    # mmr spread worth a single role swap a lobby needs to satisfy
+    # its map's role limits, when the queue is split into lobbies
+    lobby_role_swap_penalty: float = 100.0
+    # mmr spread worth sitting out a player one priority rank above
+    # the lowest priority surplus players, they always sit out if not set
+    sit_out_penalty: float | None = None
+    # processes balancing lobbies of a single call in parallel,
+    # lobbies are balanced in the calling process if it's 1
+    lobby_workers: int = 1
+    # seconds between forming lobbies from the persistent queue
+    queue_tick_seconds: float = 1.0
+    # biggest mmr spread of a lobby queued players accept,
+    # widening with time they wait in the persistent queue
+    queue_mmr_windows: list[MmrWindow] = [
+        MmrWindow(wait_seconds=0, max_mmr_spread=300),
+        MmrWindow(wait_seconds=30, max_mmr_spread=600),
+        MmrWindow(wait_seconds=60, max_mmr_spread=1000),
+        MmrWindow(wait_seconds=120, max_mmr_spread=2000),
+    ]
 
 
 class MatchmakingConfigHandler:
+    # bumped on every config update, so data compiled from the config
+    # can be invalidated
+    config_version = 0
+
     @classmethod
     def generate_from_local_file(cls) -> MatchmakingConfig:
         try:
@@ -85,6 +123,17 @@ class MatchmakingConfigHandler:
         config.map_types = new_conf.map_types
         config.maps = new_conf.maps
         config.factions = new_conf.factions
+        config.team_size = new_conf.team_size
+        config.balance_time_budget = new_conf.balance_time_budget
+        config.alternative_splits_amount = new_conf.alternative_splits_amount
+        config.joint_role_balancing = new_conf.joint_role_balancing
+        config.offclass_penalty = new_conf.offclass_penalty
+        config.lobby_role_swap_penalty = new_conf.lobby_role_swap_penalty
+        config.sit_out_penalty = new_conf.sit_out_penalty
+        config.lobby_workers = new_conf.lobby_workers
+        config.queue_tick_seconds = new_conf.queue_tick_seconds
+        config.queue_mmr_windows = new_conf.queue_mmr_windows
+        cls.config_version += 1
 
 
 config = MatchmakingConfigHandler.generate_from_local_file()
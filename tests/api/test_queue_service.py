@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+import pytest
+
+from app.api.matchmaking_service import MatchmakingService
+from app.api.queue_service import QueueService
+from app.api.schema import PlayerModel
+from app.converters import MatchmakerConverter, PlayerConverter
+from app.matchmaking_config import MatchmakingConfig
+
+
+@pytest.fixture()
+def queue_service(default_config: MatchmakingConfig) -> QueueService:
+    default_config.queue_mmr_windows = []
+    matchmaking_service = MatchmakingService(
+        default_config, MatchmakerConverter(PlayerConverter()), ThreadPoolExecutor(1)
+    )
+    return QueueService(matchmaking_service)
+
+
+@pytest.fixture()
+def player_models(
+    players_testdata_loader: Callable[[str], list[dict[str, Any]]]
+) -> list[PlayerModel]:
+    return [
+        PlayerModel(
+            id=player_data["id"],
+            mmr=player_data["mmr"],
+            cav=player_data["proficiency"]["Cavalry"],
+            inf=player_data["proficiency"]["Infantry"],
+            arch=player_data["proficiency"]["Archer"],
+            igl=player_data["igl"],
+        )
+        for player_data in players_testdata_loader("default.json")
+    ]
+
+
+class TestQueueService:
+    def test_tick_creates_games(
+        self, queue_service: QueueService, player_models: list[PlayerModel]
+    ) -> None:
+        for player_model in player_models:
+            queue_service.join(player_model)
+        result = queue_service.tick()
+        assert result is not None
+        assert len(result.games) == 1
+        assert queue_service.pop_results() == [result]
+        assert queue_service.pop_results() == []
+        assert queue_service.tick() is None
+
+    def test_left_players_are_not_matched(
+        self, queue_service: QueueService, player_models: list[PlayerModel]
+    ) -> None:
+        for player_model in player_models:
+            queue_service.join(player_model)
+        assert queue_service.leave(player_models[0].id)
+        assert not queue_service.leave(player_models[0].id)
+        assert queue_service.tick() is None
@@ -0,0 +1,64 @@
+import json
+from typing import Any, Callable
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.app_builder import create_app
+from app.api.schema import MatchmakerBatchItemModel, MatchmakerResponeModel
+
+
+@pytest.fixture()
+def client() -> TestClient:
+    return TestClient(create_app())
+
+
+@pytest.fixture()
+def players_data(
+    players_testdata_loader: Callable[[str], list[dict[str, Any]]]
+) -> list[dict[str, Any]]:
+    return [
+        {
+            "id": player_data["id"],
+            "mmr": player_data["mmr"],
+            "cav": player_data["proficiency"]["Cavalry"],
+            "inf": player_data["proficiency"]["Infantry"],
+            "arch": player_data["proficiency"]["Archer"],
+            "igl": player_data["igl"],
+        }
+        for player_data in players_testdata_loader("default.json")
+    ]
+
+
+class TestPlayersRoutes:
+    def test_create_games(
+        self, client: TestClient, players_data: list[dict[str, Any]]
+    ) -> None:
+        response = client.post("/players", json=players_data)
+        assert response.status_code == 200
+        result = MatchmakerResponeModel.parse_obj(response.json())
+        assert len(result.games) == 1
+
+    def test_not_enough_players(
+        self, client: TestClient, players_data: list[dict[str, Any]]
+    ) -> None:
+        response = client.post("/players", json=players_data[:11])
+        assert response.status_code == 400
+
+    def test_create_games_batch(
+        self, client: TestClient, players_data: list[dict[str, Any]]
+    ) -> None:
+        player_lists = [players_data, players_data[:11], players_data]
+        content = "\n".join(json.dumps(players) for players in player_lists)
+        response = client.post("/players/batch", content=content)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        items = [
+            MatchmakerBatchItemModel.parse_raw(line)
+            for line in response.text.splitlines()
+        ]
+        items.sort(key=lambda item: item.index)
+        assert [item.index for item in items] == [0, 1, 2]
+        assert items[0].result is not None and len(items[0].result.games) == 1
+        assert items[1].result is None and items[1].error
+        assert items[2].result is not None
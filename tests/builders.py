@@ -1,3 +1,4 @@
+import random
 from typing import Any, Callable
 
 import pytest
@@ -10,7 +11,7 @@ from app.matchmaker.game.balancer_rules import (
     IglBalanceRule,
     InfEqualityRule,
 )
-from app.matchmaker.game.player_balancer import PlayerBalancer
+from app.matchmaker.game.player_balancer import BitmaskPlayerBalancer, PlayerBalancer
 from app.matchmaker.game.role_picker import RolePicker
 from app.matchmaker.game.role_picker_rules import (
     RolePickingRules,
@@ -126,6 +127,46 @@ def get_player_balancer(
     return get_teams_creator
 
 
+@pytest.fixture()
+def get_bitmask_player_balancer(
+    get_role_picker: Callable[[str], RolePicker],
+    default_balancer_rules: list[BalanceRule],
+) -> Callable[[str], BitmaskPlayerBalancer]:
+    def get_teams_creator(player_pool: str) -> BitmaskPlayerBalancer:
+        role_picker = get_role_picker(player_pool)
+        players = role_picker.set_player_roles()
+        return BitmaskPlayerBalancer(players=players, rules=default_balancer_rules)
+
+    return get_teams_creator
+
+
+@pytest.fixture()
+def random_players(
+    proficiency_constructor: Callable[[dict[str, str]], RoleProficiency]
+) -> Callable[..., PlayerPool]:
+    """Creates a pool of players with random roles, mmr and igls"""
+
+    def create_players(seed: int, team_size: int = 6) -> PlayerPool:
+        rng = random.Random(seed)
+        players: list[Player] = []
+        for index in range(team_size * 2):
+            proficiencies = ["10", str(rng.randint(0, 9)), str(rng.randint(0, 9))]
+            rng.shuffle(proficiencies)
+            proficiency_data = dict(
+                zip(("Cavalry", "Infantry", "Archer"), proficiencies)
+            )
+            player = Player(
+                id=str(index),
+                igl=rng.random() < 0.25,
+                mmr=rng.randint(10, 60) * 100,
+                role_proficiency=proficiency_constructor(proficiency_data),
+            )
+            players.append(player)
+        return PlayerPool(players, team_size)
+
+    return create_players
+
+
 @pytest.fixture()
 def default_player_balancer(
     get_player_balancer: Callable[[str], PlayerBalancer]
@@ -0,0 +1,91 @@
+import time
+from typing import Callable
+
+import pytest
+
+from app.enums import PlayerRole
+from app.matchmaker.game.balancer_rules import (
+    ArchEqualityRule,
+    BalanceRule,
+    CavEqualityRule,
+    IglBalanceRule,
+    InfEqualityRule,
+)
+from app.matchmaker.game.branch_and_bound import (
+    AnytimeBalancer,
+    BranchAndBoundBalancer,
+)
+from app.matchmaker.game.player_balancer import PlayerBalancer
+from app.matchmaker.player_pool import PlayerPool
+
+
+def create_balancer_rules() -> list[BalanceRule]:
+    return [CavEqualityRule(), InfEqualityRule(), ArchEqualityRule(), IglBalanceRule()]
+
+
+class TestBranchAndBoundBalancer:
+    @pytest.mark.parametrize("seed", range(20))
+    def test_same_mmr_diff_as_brute_force(
+        self, random_players: Callable[..., PlayerPool], seed: int
+    ) -> None:
+        players = random_players(seed)
+        expected_team1, expected_team2 = PlayerBalancer(
+            players, create_balancer_rules()
+        ).create_teams()
+        team1, team2 = BranchAndBoundBalancer(
+            players, create_balancer_rules()
+        ).create_teams()
+        assert abs(team1.avg_mmr - team2.avg_mmr) == pytest.approx(
+            abs(expected_team1.avg_mmr - expected_team2.avg_mmr)
+        )
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_balancer_respects_rules(
+        self, random_players: Callable[..., PlayerPool], seed: int
+    ) -> None:
+        players = random_players(seed)
+        for index, player in enumerate(players):
+            player.current_role = list(PlayerRole)[index % 3]
+        team1, team2 = BranchAndBoundBalancer(
+            players, create_balancer_rules()
+        ).create_teams()
+        for rule in create_balancer_rules():
+            assert rule.check_teams(team1, team2)
+        assert all(player not in team2 for player in team1)
+
+    def test_visits_less_nodes_than_splits(
+        self, random_players: Callable[..., PlayerPool]
+    ) -> None:
+        balancer = BranchAndBoundBalancer(random_players(0), create_balancer_rules())
+        balancer.create_teams()
+        assert 0 < balancer.visited_nodes < 462
+
+
+class TestAnytimeBalancer:
+    @pytest.mark.parametrize("team_size", (6, 8))
+    @pytest.mark.parametrize("seed", range(10))
+    def test_same_mmr_diff_as_branch_and_bound(
+        self, random_players: Callable[..., PlayerPool], team_size: int, seed: int
+    ) -> None:
+        players = random_players(seed, team_size)
+        expected_team1, expected_team2 = BranchAndBoundBalancer(
+            players, create_balancer_rules()
+        ).create_teams()
+        balancer = AnytimeBalancer(players, create_balancer_rules())
+        team1, team2 = balancer.create_teams(deadline=time.monotonic() + 60)
+        assert balancer.is_optimal
+        assert abs(team1.avg_mmr - team2.avg_mmr) == pytest.approx(
+            abs(expected_team1.avg_mmr - expected_team2.avg_mmr)
+        )
+
+    def test_expired_deadline_returns_valid_teams(
+        self, random_players: Callable[..., PlayerPool]
+    ) -> None:
+        players = random_players(0, 12)
+        for index, player in enumerate(players):
+            player.current_role = list(PlayerRole)[index % 3]
+        balancer = AnytimeBalancer(players, create_balancer_rules())
+        team1, team2 = balancer.create_teams(deadline=time.monotonic())
+        assert not balancer.is_optimal
+        for rule in create_balancer_rules():
+            assert rule.check_teams(team1, team2)
@@ -0,0 +1,70 @@
+import itertools
+
+from app.enums import PlayerRole
+from app.matchmaker.game.compiled_rules import CompiledRulesCache
+from app.matchmaker.game.role_picker_rules import RolePickingRules
+from app.matchmaking_config import (
+    ClassLimitations,
+    MatchmakingConfig,
+    MatchmakingConfigHandler,
+)
+
+
+def get_limits(config: MatchmakingConfig) -> ClassLimitations:
+    return next(iter(config.map_types.values())).class_limitations
+
+
+class TestCompiledRulesCache:
+    def test_rules_are_shared_for_equal_limits(
+        self, default_config: MatchmakingConfig
+    ) -> None:
+        cache = CompiledRulesCache()
+        limits = get_limits(default_config)
+        rules = cache.get_rules(limits, 6)
+        assert cache.get_rules(limits.copy(), 6) is rules
+        assert cache.get_rules(limits, 8) is not rules
+
+    def test_rules_are_compiled_from_limits(
+        self,
+        default_config: MatchmakingConfig,
+        default_role_swapping_rules: RolePickingRules,
+    ) -> None:
+        rules = CompiledRulesCache().get_rules(get_limits(default_config), 6)
+        for index, role in enumerate(PlayerRole):
+            assert (
+                rules.min_counts[index]
+                == default_role_swapping_rules.min[role].boundary
+            )
+            assert (
+                rules.max_counts[index]
+                == default_role_swapping_rules.max[role].boundary
+            )
+        expected_role_counts = [
+            role_counts
+            for role_counts in itertools.product(range(13), repeat=3)
+            if sum(role_counts) == 12
+            and default_role_swapping_rules.get_required_swaps_amount(
+                dict(zip(PlayerRole, role_counts))
+            )
+            == 0
+        ]
+        assert list(rules.valid_role_counts) == expected_role_counts
+
+    def test_cache_is_dropped_on_config_update(
+        self, default_config: MatchmakingConfig
+    ) -> None:
+        cache = CompiledRulesCache()
+        limits = get_limits(default_config)
+        rules = cache.get_rules(limits, 6)
+        MatchmakingConfigHandler.update_config({})
+        assert cache.get_rules(limits, 6) is not rules
+
+    def test_config_is_compiled_in_advance(
+        self, default_config: MatchmakingConfig
+    ) -> None:
+        cache = CompiledRulesCache()
+        cache.compile_config(default_config)
+        compiled_rules = cache._compiled_rules.copy()
+        for map_type in default_config.map_types.values():
+            cache.get_rules(map_type.class_limitations, default_config.team_size)
+        assert cache._compiled_rules == compiled_rules
@@ -0,0 +1,178 @@
+import itertools
+from typing import Callable
+
+import pytest
+
+from app.enums import PlayerRole
+from app.exceptions import TeamsCreatingError
+from app.matchmaker.game.balancer_rules import (
+    ArchEqualityRule,
+    BalanceRule,
+    CavEqualityRule,
+    IglBalanceRule,
+    InfEqualityRule,
+)
+from app.matchmaker.game.joint_balancer import (
+    JointRoleBalancer,
+    get_feasible_team_role_counts,
+)
+from app.matchmaker.game.role_picker_rules import (
+    RolePickingRules,
+    RolePickingRulesFactory,
+)
+from app.matchmaker.game.role_swap import RoleSwapFactory
+from app.matchmaker.game.team import Team
+from app.matchmaker.player_pool import PlayerPool
+from app.matchmaking_config import ClassLimitations
+
+
+def create_balancer_rules() -> list[BalanceRule]:
+    return [CavEqualityRule(), InfEqualityRule(), ArchEqualityRule(), IglBalanceRule()]
+
+
+def create_role_rules(**limits: int) -> RolePickingRules:
+    class_limitations = ClassLimitations(fill_cav=False, fill_arch=False, **limits)
+    return RolePickingRulesFactory(class_limitations).create_rules()
+
+
+def get_cost(team1: Team, team2: Team, offclass_penalty: float) -> float:
+    loss = sum(
+        10 - player.current_proficiency for player in itertools.chain(team1, team2)
+    )
+    return abs(team1.avg_mmr - team2.avg_mmr) + offclass_penalty * loss
+
+
+def get_brute_force_cost(
+    players: PlayerPool, rules: RolePickingRules, offclass_penalty: float
+) -> float:
+    """Checks every split with every role assignment"""
+    igls = sorted(
+        (player for player in players if player.igl),
+        key=lambda player: player.mmr,
+        reverse=True,
+    )[:2]
+    best_cost = float("inf")
+    team_size = len(players) // 2
+    for team1_indexes in itertools.combinations(range(len(players)), team_size):
+        team1 = [players[index] for index in team1_indexes]
+        team2 = [player for player in players if player not in team1]
+        if len(igls) == 2 and (igls[0] in team1) == (igls[1] in team1):
+            continue
+        for roles in itertools.product(PlayerRole, repeat=len(players)):
+            team1_roles = roles[:team_size]
+            team2_roles = roles[team_size:]
+            role_counts = {role: roles.count(role) for role in PlayerRole}
+            if rules.get_required_swaps_amount(role_counts) != 0:
+                continue
+            if any(
+                team1_roles.count(role) != team2_roles.count(role)
+                for role in PlayerRole
+            ):
+                continue
+            loss = sum(
+                10 - player.get_role_proficiency(role)
+                for player, role in zip(team1 + team2, roles)
+            )
+            mmr_diff = abs(
+                sum(player.mmr_raw for player in team1)
+                - sum(player.mmr_raw for player in team2)
+            )
+            best_cost = min(best_cost, mmr_diff / team_size + offclass_penalty * loss)
+    return best_cost
+
+
+class TestFeasibleTeamRoleCounts:
+    def test_balanced_roles_have_equal_counts(
+        self, default_role_swapping_rules: RolePickingRules
+    ) -> None:
+        boundaries = tuple(
+            (
+                default_role_swapping_rules.min[role].boundary,
+                default_role_swapping_rules.max[role].boundary,
+            )
+            for role in PlayerRole
+        )
+        pairs = get_feasible_team_role_counts(6, boundaries, (True, True, True))
+        assert pairs
+        for team1_counts, team2_counts in pairs:
+            assert team1_counts == team2_counts
+            assert sum(team1_counts) == 6
+            for role_count, (min_players, max_players) in zip(team1_counts, boundaries):
+                assert min_players <= role_count * 2 <= max_players
+
+    def test_unbalanced_roles(self) -> None:
+        boundaries = ((0, 12), (0, 12), (0, 12))
+        pairs = get_feasible_team_role_counts(2, boundaries, (False, False, False))
+        assert len(pairs) == 36
+
+
+class TestJointRoleBalancer:
+    @pytest.mark.parametrize("seed", range(10))
+    def test_teams_respect_rules(
+        self,
+        random_players: Callable[..., PlayerPool],
+        default_role_swapping_rules: RolePickingRules,
+        seed: int,
+    ) -> None:
+        players = random_players(seed)
+        balancer = JointRoleBalancer(
+            players,
+            default_role_swapping_rules,
+            create_balancer_rules(),
+            RoleSwapFactory(),
+            offclass_penalty=5,
+        )
+        team1, team2 = balancer.create_teams()
+        assert balancer.is_optimal
+        assert sorted(map(id, team1 + team2)) == sorted(map(id, players))
+        for rule in create_balancer_rules():
+            assert rule.check_teams(team1, team2)
+        role_counts = {
+            role: players.get_role_players_amount(role) for role in PlayerRole
+        }
+        assert default_role_swapping_rules.get_required_swaps_amount(role_counts) == 0
+
+    @pytest.mark.parametrize("offclass_penalty", (0, 0.5, 5))
+    @pytest.mark.parametrize("seed", range(5))
+    def test_finds_the_lowest_cost(
+        self,
+        random_players: Callable[..., PlayerPool],
+        seed: int,
+        offclass_penalty: float,
+    ) -> None:
+        players = random_players(seed, 3)
+        rules = create_role_rules(
+            max_cav=1, max_arch=1, max_inf=3, min_cav=0, min_arch=0, min_inf=1
+        )
+        expected_cost = get_brute_force_cost(players, rules, offclass_penalty)
+        balancer = JointRoleBalancer(
+            players, rules, create_balancer_rules(), RoleSwapFactory(), offclass_penalty
+        )
+        team1, team2 = balancer.create_teams()
+        assert get_cost(team1, team2, offclass_penalty) == pytest.approx(expected_cost)
+
+    def test_infeasible_limits(self, random_players: Callable[..., PlayerPool]) -> None:
+        rules = create_role_rules(
+            max_cav=6, max_arch=6, max_inf=6, min_cav=4, min_arch=0, min_inf=4
+        )
+        balancer = JointRoleBalancer(
+            random_players(0), rules, create_balancer_rules(), RoleSwapFactory(), 5
+        )
+        with pytest.raises(TeamsCreatingError):
+            balancer.create_teams()
+
+    def test_deadline(
+        self,
+        random_players: Callable[..., PlayerPool],
+        default_role_swapping_rules: RolePickingRules,
+    ) -> None:
+        balancer = JointRoleBalancer(
+            random_players(3),
+            default_role_swapping_rules,
+            create_balancer_rules(),
+            RoleSwapFactory(),
+            offclass_penalty=5,
+        )
+        team1, team2 = balancer.create_teams(deadline=0)
+        assert balancer.visited_splits == 1
+        assert len(team1) == len(team2) == 6
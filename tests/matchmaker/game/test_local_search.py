@@ -0,0 +1,63 @@
+from typing import Callable
+
+import pytest
+
+from app.enums import PlayerRole
+from app.matchmaker.game.balancer_rules import (
+    ArchEqualityRule,
+    BalanceRule,
+    CavEqualityRule,
+    IglBalanceRule,
+    InfEqualityRule,
+)
+from app.matchmaker.game.local_search import LocalSearchBalancer
+from app.matchmaker.player_pool import PlayerPool
+
+
+def create_balancer_rules() -> list[BalanceRule]:
+    return [CavEqualityRule(), InfEqualityRule(), ArchEqualityRule(), IglBalanceRule()]
+
+
+def set_even_roles(players: PlayerPool) -> None:
+    roles = [PlayerRole.cav, PlayerRole.cav, PlayerRole.arch, PlayerRole.arch]
+    roles += [PlayerRole.inf] * (len(players) - len(roles))
+    for player, role in zip(players, roles):
+        player.current_role = role
+
+
+class TestLocalSearchBalancer:
+    @pytest.mark.parametrize("team_size", (6, 8, 10, 12))
+    @pytest.mark.parametrize("seed", range(5))
+    def test_balancer_respects_rules(
+        self, random_players: Callable[..., PlayerPool], team_size: int, seed: int
+    ) -> None:
+        players = random_players(seed, team_size)
+        set_even_roles(players)
+        balancer = LocalSearchBalancer(players, create_balancer_rules())
+        team1, team2 = balancer.create_teams()
+        assert len(team1) == len(team2) == team_size
+        assert all(player not in team2 for player in team1)
+        for rule in create_balancer_rules():
+            assert rule.check_teams(team1, team2)
+
+    def test_separates_best_igls_of_different_roles(
+        self, random_players: Callable[..., PlayerPool]
+    ) -> None:
+        players = random_players(0, 10)
+        set_even_roles(players)
+        for player in players:
+            player.igl = False
+        players[0].igl = True
+        players[-1].igl = True
+        team1, team2 = LocalSearchBalancer(
+            players, create_balancer_rules()
+        ).create_teams()
+        assert IglBalanceRule().check_teams(team1, team2)
+
+    def test_mmr_diff_is_low(self, random_players: Callable[..., PlayerPool]) -> None:
+        players = random_players(0, 12)
+        set_even_roles(players)
+        team1, team2 = LocalSearchBalancer(
+            players, create_balancer_rules()
+        ).create_teams()
+        assert abs(team1.avg_mmr - team2.avg_mmr) < 50
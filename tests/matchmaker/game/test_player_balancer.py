@@ -1,10 +1,29 @@
+import itertools
+import time
 from typing import Callable
 
 import pytest
 
-from app.matchmaker.game.balancer_rules import BalanceRule
-from app.matchmaker.game.player_balancer import PlayerBalancer
+from app.enums import PlayerRole
+from app.matchmaker.game.balancer_rules import (
+    ArchEqualityRule,
+    BalanceRule,
+    CavEqualityRule,
+    IglBalanceRule,
+    InfEqualityRule,
+)
+from app.matchmaker.game.player_balancer import (
+    BatchPlayerBalancer,
+    BitmaskPlayerBalancer,
+    PlayerBalancer,
+    RelaxingPlayerBalancer,
+)
 from app.matchmaker.game.team import Team
+from app.matchmaker.player_pool import PlayerPool
+
+
+def create_balancer_rules() -> list[BalanceRule]:
+    return [CavEqualityRule(), InfEqualityRule(), ArchEqualityRule(), IglBalanceRule()]
 
 
 class TestPlayerBalancer:
@@ -32,6 +51,19 @@ class TestPlayerBalancer:
         for rule in default_balancer_rules:
             assert rule.check_teams(team1, team2)
 
+    def test_expired_deadline_returns_first_valid_teams(
+        self, default_player_balancer: PlayerBalancer
+    ) -> None:
+        team1, team2 = default_player_balancer.create_teams(deadline=time.monotonic())
+        assert not default_player_balancer.is_optimal
+        assert all([player not in team2 for player in team1])
+
+    def test_balancer_is_optimal_without_deadline(
+        self, default_player_balancer: PlayerBalancer
+    ) -> None:
+        default_player_balancer.create_teams()
+        assert default_player_balancer.is_optimal
+
     def test_resulting_teams_have_no_common_players(
         self,
         get_player_balancer: Callable[[str], PlayerBalancer],
@@ -39,3 +71,134 @@ class TestPlayerBalancer:
         balancer = get_player_balancer("default")
         team1, team2 = balancer.create_teams()
         assert all([player not in team2 for player in team1])
+
+
+class TestBitmaskPlayerBalancer:
+    @pytest.mark.parametrize("playerpool", (("all_inf"), ("default"), ("all_cav")))
+    def test_balancer_respects_rules(
+        self,
+        get_bitmask_player_balancer: Callable[[str], BitmaskPlayerBalancer],
+        default_balancer_rules: list[BalanceRule],
+        playerpool: str,
+    ) -> None:
+        balancer = get_bitmask_player_balancer(playerpool)
+        team1, team2 = balancer.create_teams()
+        for rule in default_balancer_rules:
+            assert rule.check_teams(team1, team2)
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_same_teams_as_brute_force(
+        self, random_players: Callable[..., PlayerPool], seed: int
+    ) -> None:
+        players = random_players(seed)
+        expected_team1, expected_team2 = PlayerBalancer(
+            players, create_balancer_rules()
+        ).create_teams()
+        team1, team2 = BitmaskPlayerBalancer(
+            players, create_balancer_rules()
+        ).create_teams()
+        assert team1 == expected_team1
+        assert team2 == expected_team2
+
+
+class TestBatchPlayerBalancer:
+    @pytest.mark.parametrize("seed", range(10))
+    def test_same_teams_as_brute_force(
+        self, random_players: Callable[..., PlayerPool], seed: int
+    ) -> None:
+        players = random_players(seed)
+        expected_team1, expected_team2 = PlayerBalancer(
+            players, create_balancer_rules()
+        ).create_teams()
+        team1, team2 = BatchPlayerBalancer(
+            players, create_balancer_rules()
+        ).create_teams()
+        assert team1 == expected_team1
+        assert team2 == expected_team2
+
+    def test_balancer_without_rules(self, default_players: PlayerPool) -> None:
+        team1, team2 = BatchPlayerBalancer(default_players, []).create_teams()
+        assert abs(team1.avg_mmr - team2.avg_mmr) == pytest.approx(
+            min(
+                abs(t1.avg_mmr - t2.avg_mmr)
+                for t1, t2 in (
+                    PlayerBalancer(default_players, [])._get_teams_by_players(players)
+                    for players in itertools.combinations(default_players, 6)
+                )
+            )
+        )
+
+
+class TestRelaxingPlayerBalancer:
+    @pytest.mark.parametrize("seed", range(20))
+    def test_same_teams_as_brute_force(
+        self, random_players: Callable[..., PlayerPool], seed: int
+    ) -> None:
+        players = random_players(seed)
+        expected_team1, expected_team2 = PlayerBalancer(
+            players, create_balancer_rules()
+        ).create_teams()
+        team1, team2 = RelaxingPlayerBalancer(
+            players, create_balancer_rules()
+        ).create_teams()
+        assert team1 == expected_team1
+        assert team2 == expected_team2
+
+    def test_infeasible_pool_keeps_rules(
+        self, random_players: Callable[..., PlayerPool]
+    ) -> None:
+        players = random_players(0)
+        for player in players[:3]:
+            player.current_role = PlayerRole.cav
+        for player in players[3:]:
+            player.current_role = PlayerRole.inf
+        rules = create_balancer_rules()
+        balancer = RelaxingPlayerBalancer(players, rules)
+        team1, team2 = balancer.create_teams()
+        assert len(balancer.rules) == 4
+        assert team1.total_cav != team2.total_cav
+
+
+class TestRankedTeams:
+    @pytest.mark.parametrize(
+        "balancer_class",
+        (PlayerBalancer, BatchPlayerBalancer, RelaxingPlayerBalancer),
+    )
+    @pytest.mark.parametrize("seed", range(5))
+    def test_ranked_teams_are_sorted_and_distinct(
+        self,
+        random_players: Callable[..., PlayerPool],
+        balancer_class: type[PlayerBalancer],
+        seed: int,
+    ) -> None:
+        players = random_players(seed)
+        balancer = balancer_class(players, create_balancer_rules())
+        ranked_teams = balancer.create_ranked_teams(5)
+        mmr_diffs = [abs(t1.avg_mmr - t2.avg_mmr) for t1, t2 in ranked_teams]
+        assert mmr_diffs == sorted(mmr_diffs)
+        team_sets = {frozenset(id(player) for player in t1) for t1, _ in ranked_teams}
+        assert len(team_sets) == len(ranked_teams)
+        assert all(players[0] in team1 for team1, _ in ranked_teams)
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_same_ranking_as_brute_force(
+        self, random_players: Callable[..., PlayerPool], seed: int
+    ) -> None:
+        players = random_players(seed)
+        expected = PlayerBalancer(players, create_balancer_rules()).create_ranked_teams(
+            5
+        )
+        ranked_teams = RelaxingPlayerBalancer(
+            players, create_balancer_rules()
+        ).create_ranked_teams(5)
+        assert ranked_teams == expected
+
+    def test_best_ranked_teams_are_created_teams(
+        self, random_players: Callable[..., PlayerPool]
+    ) -> None:
+        players = random_players(0)
+        teams = RelaxingPlayerBalancer(players, create_balancer_rules()).create_teams()
+        ranked_teams = RelaxingPlayerBalancer(
+            players, create_balancer_rules()
+        ).create_ranked_teams(3)
+        assert ranked_teams[0] == teams
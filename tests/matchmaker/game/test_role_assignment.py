@@ -0,0 +1,79 @@
+import itertools
+from typing import Callable
+
+import pytest
+
+from app.enums import PlayerRole
+from app.matchmaker.game.role_assignment import RoleAssignmentSolver
+from app.matchmaker.game.role_picker_rules import (
+    RolePickingRules,
+    RolePickingRulesFactory,
+)
+from app.matchmaker.player_pool import PlayerPool
+from app.matchmaking_config import ClassLimitations
+
+
+def get_proficiency_loss(players: PlayerPool, roles: list[PlayerRole]) -> int:
+    return sum(
+        10 - player.get_role_proficiency(role) for player, role in zip(players, roles)
+    )
+
+
+def get_required_swaps(rules: RolePickingRules, roles: list[PlayerRole]) -> int:
+    role_counts = {role: roles.count(role) for role in PlayerRole}
+    return rules.get_required_swaps_amount(role_counts)
+
+
+@pytest.fixture()
+def small_team_rules() -> RolePickingRules:
+    limits = ClassLimitations(
+        max_cav=1,
+        max_arch=1,
+        max_inf=4,
+        min_cav=0,
+        min_arch=0,
+        min_inf=2,
+        fill_cav=False,
+        fill_arch=False,
+    )
+    return RolePickingRulesFactory(limits).create_rules()
+
+
+class TestRoleAssignmentSolver:
+    @pytest.mark.parametrize("seed", range(10))
+    def test_roles_satisfy_rules(
+        self,
+        random_players: Callable[..., PlayerPool],
+        default_role_swapping_rules: RolePickingRules,
+        seed: int,
+    ) -> None:
+        players = random_players(seed)
+        roles = RoleAssignmentSolver(default_role_swapping_rules).solve(players)
+        assert len(roles) == len(players)
+        assert get_required_swaps(default_role_swapping_rules, roles) == 0
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_minimal_proficiency_loss(
+        self,
+        random_players: Callable[..., PlayerPool],
+        small_team_rules: RolePickingRules,
+        seed: int,
+    ) -> None:
+        players = random_players(seed, 4)
+        roles = RoleAssignmentSolver(small_team_rules).solve(players)
+        expected_loss = min(
+            get_proficiency_loss(players, list(assignment))
+            for assignment in itertools.product(PlayerRole, repeat=len(players))
+            if get_required_swaps(small_team_rules, list(assignment)) == 0
+        )
+        assert get_required_swaps(small_team_rules, roles) == 0
+        assert get_proficiency_loss(players, roles) == expected_loss
+
+    def test_keeps_main_roles_when_rules_are_satisfied(
+        self,
+        get_players: Callable[[str], PlayerPool],
+        default_role_swapping_rules: RolePickingRules,
+    ) -> None:
+        players = get_players("all_inf")
+        roles = RoleAssignmentSolver(default_role_swapping_rules).solve(players)
+        assert roles == [player.main for player in players]
@@ -32,6 +32,13 @@ class TestRolePicker:
         result_playerpool = picker.set_player_roles()
         assert result_playerpool.get_role_players_amount(PlayerRole.cav) == 4
 
+    def test_main_roles_are_kept_when_feasible(
+        self, get_role_picker: Callable[[str], RolePicker]
+    ) -> None:
+        picker = get_role_picker("all_inf")
+        players = picker.set_player_roles()
+        assert not any(player.is_offclass for player in players)
+
 
 if __name__ == "__main__":
     pytest.main()
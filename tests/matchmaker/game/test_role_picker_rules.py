@@ -0,0 +1,65 @@
+import itertools
+
+import pytest
+
+from app.enums import PlayerRole
+from app.matchmaker.game.role_picker_rules import RolePickingRules
+
+
+def get_all_role_counts(players_amount: int) -> list[tuple[int, ...]]:
+    return [
+        role_counts
+        for role_counts in itertools.product(range(players_amount + 1), repeat=3)
+        if sum(role_counts) == players_amount
+    ]
+
+
+def get_required_swaps(rules: RolePickingRules, role_counts: tuple[int, ...]) -> int:
+    return rules.get_required_swaps_amount(dict(zip(PlayerRole, role_counts)))
+
+
+class TestFeasibleRoleCountsTable:
+    def test_table_is_built_once(
+        self, default_role_swapping_rules: RolePickingRules
+    ) -> None:
+        table = default_role_swapping_rules.get_feasible_table(12)
+        assert default_role_swapping_rules.get_feasible_table(12) is table
+
+    def test_required_swaps_match_rules(
+        self, default_role_swapping_rules: RolePickingRules
+    ) -> None:
+        table = default_role_swapping_rules.get_feasible_table(12)
+        for role_counts in get_all_role_counts(12):
+            required_swaps = get_required_swaps(
+                default_role_swapping_rules, role_counts
+            )
+            assert table.get_required_swaps_amount(role_counts) == required_swaps
+            assert table.is_feasible(role_counts) == (required_swaps == 0)
+        assert table.feasible_role_counts == tuple(
+            role_counts
+            for role_counts in get_all_role_counts(12)
+            if get_required_swaps(default_role_swapping_rules, role_counts) == 0
+        )
+
+    @pytest.mark.parametrize("role_counts", get_all_role_counts(12))
+    def test_nearest_target(
+        self,
+        default_role_swapping_rules: RolePickingRules,
+        role_counts: tuple[int, ...],
+    ) -> None:
+        table = default_role_swapping_rules.get_feasible_table(12)
+        target_counts = table.get_target_role_counts(role_counts)
+        swaps_amount = table.get_swaps_to_target_amount(role_counts)
+        assert target_counts is not None and swaps_amount is not None
+        assert table.is_feasible(target_counts)
+        distances = [
+            sum(
+                abs(count - feasible_count)
+                for count, feasible_count in zip(role_counts, feasible_counts)
+            )
+            for feasible_counts in table.feasible_role_counts
+        ]
+        assert swaps_amount * 2 == min(distances)
+        if table.is_feasible(role_counts):
+            assert target_counts == role_counts
+            assert swaps_amount == 0
@@ -0,0 +1,60 @@
+import itertools
+from typing import Callable
+
+import pytest
+
+from app.enums import PlayerRole
+from app.matchmaker.game.balancer_rules import BalanceRule
+from app.matchmaker.game.split_table import SplitTable, get_canonical_masks
+from app.matchmaker.player_pool import PlayerPool
+
+
+class TestSplitTable:
+    def test_canonical_masks_skip_mirrored_splits(self) -> None:
+        masks = get_canonical_masks(12)
+        full_mask = (1 << 12) - 1
+        assert len(masks) == 462
+        assert all(mask.bit_count() == 6 for mask in masks)
+        assert not any((full_mask ^ mask) in masks for mask in masks)
+
+    def test_canonical_masks_order_matches_combinations(self) -> None:
+        masks = get_canonical_masks(12)
+        combinations = list(itertools.combinations(range(12), 6))[: len(masks)]
+        for mask, combination in zip(masks, combinations):
+            assert mask == sum(1 << index for index in combination)
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_split_data_matches_teams(
+        self, random_players: Callable[..., PlayerPool], seed: int
+    ) -> None:
+        split_table = SplitTable(random_players(seed))
+        for split_index, mask in enumerate(split_table.masks):
+            team1, team2 = split_table.create_teams(mask)
+            assert split_table.get_mmr_diff(split_index) == pytest.approx(
+                abs(team1.avg_mmr - team2.avg_mmr)
+            )
+            assert split_table.count_role(mask, PlayerRole.cav) == team1.total_cav
+            assert split_table.count_role(mask, PlayerRole.inf) == team1.total_inf
+            assert split_table.count_role(mask, PlayerRole.arch) == team1.total_arch
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_batched_rule_checks_match_single_checks(
+        self,
+        random_players: Callable[..., PlayerPool],
+        default_balancer_rules: list[BalanceRule],
+        seed: int,
+    ) -> None:
+        split_table = SplitTable(random_players(seed))
+        for rule in default_balancer_rules:
+            expected = [
+                rule.check_split(split_table, mask) for mask in split_table.masks
+            ]
+            assert rule.check_splits(split_table) == expected
+
+    def test_create_teams_has_no_common_players(
+        self, default_players: PlayerPool
+    ) -> None:
+        split_table = SplitTable(default_players)
+        team1, team2 = split_table.create_teams(split_table.masks[100])
+        assert all(player not in team2 for player in team1)
+        assert len(team1) + len(team2) == 12
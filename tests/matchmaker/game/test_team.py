@@ -0,0 +1,73 @@
+from typing import Callable
+
+import pytest
+
+from app.enums import PlayerRole
+from app.matchmaker.game.team import Team
+from app.matchmaker.player_pool import PlayerPool
+
+
+def count_role(team: Team, role: PlayerRole) -> int:
+    return len([player for player in team if player.current_role == role])
+
+
+def assert_aggregates_match(team: Team) -> None:
+    assert team.avg_mmr == pytest.approx(
+        sum(player.mmr_raw for player in team) / len(team)
+    )
+    assert team.total_cav == count_role(team, PlayerRole.cav)
+    assert team.total_inf == count_role(team, PlayerRole.inf)
+    assert team.total_arch == count_role(team, PlayerRole.arch)
+    assert team.has_igl == any(player.igl for player in team)
+
+
+class TestTeam:
+    def test_wrong_team_size(self, default_players: PlayerPool) -> None:
+        with pytest.raises(ValueError):
+            Team(default_players[:5])
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_aggregates(
+        self, random_players: Callable[..., PlayerPool], seed: int
+    ) -> None:
+        players = random_players(seed)
+        assert_aggregates_match(Team(players[:6]))
+        assert_aggregates_match(Team(players[6:]))
+
+    def test_aggregates_follow_roster_changes(
+        self, random_players: Callable[..., PlayerPool]
+    ) -> None:
+        players = random_players(0)
+        team = Team(players[:6])
+        team.remove(players[0])
+        assert_aggregates_match(team)
+        team.append(players[6])
+        assert_aggregates_match(team)
+        team.pop(0)
+        assert_aggregates_match(team)
+        team.insert(0, players[7])
+        assert_aggregates_match(team)
+        team[1] = players[8]
+        assert_aggregates_match(team)
+        del team[2]
+        assert_aggregates_match(team)
+        team += players[9:11]
+        assert_aggregates_match(team)
+
+    def test_get_igl_picks_best_igl(
+        self, random_players: Callable[..., PlayerPool]
+    ) -> None:
+        team = Team(random_players(0)[:6])
+        for player in team:
+            player.igl = False
+        team[1].igl = True
+        team[4].igl = True
+        team = Team(list(team))
+        best_igl = max(team[1], team[4], key=lambda player: player.mmr)
+        assert team.get_igl() is best_igl
+
+    def test_get_igl_without_igls(self, default_players: PlayerPool) -> None:
+        for player in default_players:
+            player.current_role = PlayerRole.cav
+        with pytest.raises(ValueError):
+            Team(default_players[:6]).get_igl()
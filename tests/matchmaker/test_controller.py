@@ -0,0 +1,94 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+import pytest
+
+from app.api.schema import MatchmakerResponeModel, PlayerModel
+from app.converters import MatchmakerConverter, PlayerConverter
+from app.matchmaker.controller import MatchmakingController
+from app.matchmaking_config import MatchmakingConfig
+
+
+@pytest.fixture()
+def player_models(
+    players_testdata_loader: Callable[[str], list[dict[str, Any]]]
+) -> list[PlayerModel]:
+    players_data = players_testdata_loader("default.json")
+    players_data += players_testdata_loader("two_mmr_groups.json")
+    return [
+        PlayerModel(
+            id=f"{player_data['id']}{index}",
+            mmr=player_data["mmr"],
+            cav=player_data["proficiency"]["Cavalry"],
+            inf=player_data["proficiency"]["Infantry"],
+            arch=player_data["proficiency"]["Archer"],
+            igl=player_data["igl"],
+        )
+        for index, player_data in enumerate(players_data)
+    ]
+
+
+@pytest.fixture()
+def controller(default_config: MatchmakingConfig) -> MatchmakingController:
+    converter = MatchmakerConverter(PlayerConverter())
+    return MatchmakingController(converter, default_config)
+
+
+class TestMatchmakingController:
+    def test_create_games(
+        self, controller: MatchmakingController, player_models: list[PlayerModel]
+    ) -> None:
+        result = controller.create_games(player_models)
+        assert isinstance(result, MatchmakerResponeModel)
+        assert len(result.games) == 2
+        assert result.undistributed_player_ids == []
+
+    def test_create_games_with_time_budget(
+        self, controller: MatchmakingController, player_models: list[PlayerModel]
+    ) -> None:
+        result = controller.create_games(player_models[:15], balance_time_budget=0)
+        assert len(result.games) == 1
+        assert len(result.undistributed_player_ids) == 3
+
+    def test_create_games_with_alternative_splits(
+        self, controller: MatchmakingController, player_models: list[PlayerModel]
+    ) -> None:
+        controller.config.alternative_splits_amount = 3
+        result = controller.create_games(player_models)
+        for game in result.games:
+            assert len(game.alternative_splits) == 3
+            assert game.avg_mmr_diff <= game.alternative_splits[0].avg_mmr_diff
+
+    def test_create_games_with_joint_role_balancing(
+        self, controller: MatchmakingController, player_models: list[PlayerModel]
+    ) -> None:
+        controller.config.joint_role_balancing = True
+        result = controller.create_games(player_models)
+        assert len(result.games) == 2
+        for game in result.games:
+            team1_roles = sorted(player.role for player in game.team1.players)
+            team2_roles = sorted(player.role for player in game.team2.players)
+            assert team1_roles == team2_roles
+
+    def test_create_games_in_worker_processes(
+        self, controller: MatchmakingController, player_models: list[PlayerModel]
+    ) -> None:
+        controller.config.lobby_workers = 2
+        result = controller.create_games(player_models)
+        assert len(result.games) == 2
+        game_player_ids = sorted(
+            player.id
+            for game in result.games
+            for team in (game.team1, game.team2)
+            for player in team.players
+        )
+        assert game_player_ids == sorted(player.id for player in player_models)
+
+    def test_create_games_batch(
+        self, controller: MatchmakingController, player_models: list[PlayerModel]
+    ) -> None:
+        player_lists = [player_models, player_models[:12], player_models[:15]]
+        with ThreadPoolExecutor(2) as executor:
+            results = dict(controller.create_games_batch(player_lists, executor))
+        assert sorted(results) == [0, 1, 2]
+        assert [len(results[index].games) for index in range(3)] == [2, 1, 1]
@@ -0,0 +1,101 @@
+import itertools
+from typing import Callable
+
+import pytest
+
+from app.matchmaker.game.role_picker_rules import (
+    FeasibleRoleCountsTable,
+    RolePickingRulesFactory,
+)
+from app.matchmaker.lobby_partitioner import LobbyPartitioner, PlayerGroups
+from app.matchmaker.player import ALL_ROLES, Player
+from app.matchmaker.player_pool import PlayerPool
+from app.matchmaking_config import ClassLimitations
+
+
+def get_spread(players: list[Player]) -> int:
+    mmrs = [player.mmr_raw for player in players]
+    return max(mmrs) - min(mmrs)
+
+
+def get_cost(
+    groups: PlayerGroups, role_table: FeasibleRoleCountsTable, role_swap_penalty: float
+) -> float:
+    cost = 0.0
+    for group in groups:
+        role_counts = tuple(
+            sum(player.main == role for player in group) for role in ALL_ROLES
+        )
+        swaps_amount = role_table.get_swaps_to_target_amount(role_counts)
+        assert swaps_amount is not None
+        cost += get_spread(group) + role_swap_penalty * swaps_amount
+    return cost
+
+
+@pytest.fixture()
+def small_lobby_table() -> FeasibleRoleCountsTable:
+    limits = ClassLimitations(
+        max_cav=1,
+        max_arch=1,
+        max_inf=2,
+        min_cav=0,
+        min_arch=0,
+        min_inf=1,
+        fill_cav=False,
+        fill_arch=False,
+    )
+    return RolePickingRulesFactory(limits).create_rules().get_feasible_table(4)
+
+
+class TestLobbyPartitioner:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_lowest_total_spread(
+        self, random_players: Callable[..., PlayerPool], seed: int
+    ) -> None:
+        players = list(random_players(seed, 5))
+        groups, excluded_players = LobbyPartitioner(4).partition(players)
+        assert len(groups) == 2
+        assert len(excluded_players) == 2
+        assert sorted(map(id, excluded_players + groups[0] + groups[1])) == sorted(
+            map(id, players)
+        )
+        expected_spread = min(
+            get_spread(list(group1)) + get_spread(list(group2))
+            for lobby_players in itertools.combinations(players, 8)
+            for group1 in itertools.combinations(lobby_players, 4)
+            for group2 in [[p for p in lobby_players if p not in group1]]
+        )
+        assert get_spread(groups[0]) + get_spread(groups[1]) == expected_spread
+
+    @pytest.mark.parametrize("role_swap_penalty", (0, 100, 10000))
+    @pytest.mark.parametrize("seed", range(5))
+    def test_role_swaps_penalty(
+        self,
+        random_players: Callable[..., PlayerPool],
+        small_lobby_table: FeasibleRoleCountsTable,
+        seed: int,
+        role_swap_penalty: float,
+    ) -> None:
+        players = sorted(random_players(seed, 5), key=lambda player: player.mmr_raw)
+        partitioner = LobbyPartitioner(4, [small_lobby_table] * 2, role_swap_penalty)
+        groups, _ = partitioner.partition(players)
+        expected_cost = min(
+            get_cost(
+                [list(lobby_players[:4]), list(lobby_players[4:])],
+                small_lobby_table,
+                role_swap_penalty,
+            )
+            for lobby_players in itertools.combinations(players, 8)
+        )
+        cost = get_cost(groups, small_lobby_table, role_swap_penalty)
+        assert cost == pytest.approx(expected_cost)
+
+    def test_big_queue(self, random_players: Callable[..., PlayerPool]) -> None:
+        players = [player for seed in range(200) for player in random_players(seed, 6)]
+        players += list(random_players(200, 6))[:7]
+        groups, excluded_players = LobbyPartitioner(12).partition(players)
+        assert len(groups) == 200
+        assert len(excluded_players) == 7
+        assert all(len(group) == 12 for group in groups)
+        for group, next_group in zip(groups, groups[1:]):
+            assert group[-1].mmr_raw <= next_group[0].mmr_raw
@@ -0,0 +1,148 @@
+from typing import Callable
+
+import pytest
+
+from app.exceptions import PlayerAlreadyQueuedError
+from app.matchmaker.matchmaking_queue import MatchmakingQueue, MmrWindowSchedule
+from app.matchmaker.player import Player
+from app.matchmaker.player_pool import PlayerPool
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture()
+def queue(clock: FakeClock) -> MatchmakingQueue:
+    return MatchmakingQueue(window_schedule=MmrWindowSchedule([(0, 3000)]), clock=clock)
+
+
+@pytest.fixture()
+def queued_players(
+    queue: MatchmakingQueue, random_players: Callable[[int], PlayerPool]
+) -> list[Player]:
+    players = list(random_players(0)) + list(random_players(1))
+    for index, player in enumerate(players):
+        player.id = str(index)
+        queue.join(player)
+    return players
+
+
+class TestMatchmakingQueue:
+    def test_players_are_sorted_by_mmr(
+        self, queue: MatchmakingQueue, queued_players: list[Player]
+    ) -> None:
+        mmrs = [player.mmr_raw for player in queue.get_players()]
+        assert mmrs == sorted(player.mmr_raw for player in queued_players)
+
+    def test_join_twice(
+        self, queue: MatchmakingQueue, queued_players: list[Player]
+    ) -> None:
+        with pytest.raises(PlayerAlreadyQueuedError):
+            queue.join(queued_players[0])
+
+    def test_leave(self, queue: MatchmakingQueue, queued_players: list[Player]) -> None:
+        player = queued_players[3]
+        assert queue.leave(player.id) is player
+        assert player.id not in queue
+        assert player not in queue.get_players()
+        assert len(queue) == len(queued_players) - 1
+        assert queue.leave(player.id) is None
+
+    def test_tick_forms_compatible_lobbies(
+        self, queue: MatchmakingQueue, queued_players: list[Player]
+    ) -> None:
+        lobbies = queue.tick()
+        assert lobbies
+        for lobby in lobbies:
+            assert len(lobby) == queue.game_size
+            mmrs = [player.mmr_raw for player in lobby]
+            assert max(mmrs) - min(mmrs) <= 3000
+        lobby_players = [player for lobby in lobbies for player in lobby]
+        assert len(queue) == len(queued_players) - len(lobby_players)
+        assert all(player.id not in queue for player in lobby_players)
+
+    def test_tick_waits_for_enough_players(
+        self, queue: MatchmakingQueue, player: Callable[..., Player]
+    ) -> None:
+        players = [player(mmr=3000) for _ in range(12)]
+        for index, queued_player in enumerate(players[:11]):
+            queued_player.id = str(index)
+            queue.join(queued_player)
+        assert queue.tick() == []
+        players[11].id = "11"
+        queue.join(players[11])
+        assert queue.tick() == [players]
+        assert len(queue) == 0
+
+    def test_tick_sets_queue_time(
+        self, queue: MatchmakingQueue, clock: FakeClock, player: Callable[..., Player]
+    ) -> None:
+        for index in range(12):
+            clock.now = index
+            queued_player = player(mmr=3000)
+            queued_player.id = str(index)
+            queue.join(queued_player)
+        clock.now = 20
+        (lobby,) = queue.tick()
+        assert [lobby_player.queue_time for lobby_player in lobby] == [
+            20 - index for index in range(12)
+        ]
+
+    def test_windows_widen_with_wait_time(
+        self, clock: FakeClock, player: Callable[..., Player]
+    ) -> None:
+        queue = MatchmakingQueue(
+            window_schedule=MmrWindowSchedule([(0, 300), (60, 1100)]), clock=clock
+        )
+        for index in range(12):
+            queued_player = player(mmr=2000 + index * 100)
+            queued_player.id = str(index)
+            queue.join(queued_player)
+        assert queue.tick() == []
+        clock.now = 59
+        assert queue.tick() == []
+        clock.now = 60
+        (lobby,) = queue.tick()
+        assert len(lobby) == 12
+
+    def test_lobby_is_accepted_by_every_player(
+        self, clock: FakeClock, player: Callable[..., Player]
+    ) -> None:
+        queue = MatchmakingQueue(
+            window_schedule=MmrWindowSchedule([(0, 300), (60, 1100)]), clock=clock
+        )
+        for index in range(11):
+            queued_player = player(mmr=2000 + index * 100)
+            queued_player.id = str(index)
+            queue.join(queued_player)
+        clock.now = 60
+        newcomer = player(mmr=3100)
+        newcomer.id = "newcomer"
+        queue.join(newcomer)
+        assert queue.tick() == []
+        clock.now = 120
+        (lobby,) = queue.tick()
+        assert newcomer in lobby
+
+
+class TestMmrWindowSchedule:
+    @pytest.mark.parametrize(
+        "wait_time,max_spread",
+        [(0, 300), (10, 300), (30, 600), (59, 600), (60, 1000), (1000, 1000)],
+    )
+    def test_get_max_spread(self, wait_time: float, max_spread: float) -> None:
+        schedule = MmrWindowSchedule([(30, 600), (0, 300), (60, 1000)])
+        assert schedule.get_max_spread(wait_time) == max_spread
+
+    def test_empty_schedule_accepts_any_spread(self) -> None:
+        assert MmrWindowSchedule().get_max_spread(0) == float("inf")
@@ -1,5 +1,8 @@
+import pickle
+
 import pytest
 
+from app.enums import PatreonRole, PlayerRole
 from app.exceptions import ProficiencyValidationError
 from app.matchmaker import player
 
@@ -26,3 +29,49 @@ class TestProficiencyClass:
         with pytest.raises(ProficiencyValidationError):
             proficiency = player.RoleProficiency(cav=9, inf=0, arch=5)
             assert proficiency
+
+
+class TestPlayer:
+    def create_player(self) -> player.Player:
+        proficiency = player.RoleProficiency(cav=3, arch=10, inf=7)
+        return player.Player(id="1", igl=False, mmr=2000, role_proficiency=proficiency)
+
+    def test_proficiencies_are_ordered_by_roles(self) -> None:
+        mm_player = self.create_player()
+        assert mm_player.main == PlayerRole.arch
+        for role in PlayerRole:
+            assert mm_player.proficiencies[
+                player.ROLE_INDEXES[role]
+            ] == mm_player.get_role_proficiency(role)
+
+    def test_offclass_mmr(self) -> None:
+        mm_player = self.create_player()
+        assert mm_player.mmr == 2000
+        assert not mm_player.is_offclass
+        mm_player.current_role = PlayerRole.inf
+        assert mm_player.is_offclass
+        assert mm_player.mmr == mm_player.mmr_reduced == 1990
+        assert mm_player.current_proficiency == 7
+
+    def test_setting_role_proficiency_resolves_main_role(self) -> None:
+        mm_player = self.create_player()
+        mm_player._role_proficiency = player.RoleProficiency(cav=10, arch=1, inf=2)
+        assert mm_player.main == PlayerRole.cav
+        assert mm_player._role_proficiency == {
+            PlayerRole.cav: 10,
+            PlayerRole.arch: 1,
+            PlayerRole.inf: 2,
+        }
+
+    def test_player_has_no_instance_dict(self) -> None:
+        with pytest.raises(AttributeError):
+            self.create_player().__dict__
+
+    def test_record_is_picklable(self) -> None:
+        mm_player = self.create_player()
+        mm_player.patreon = PatreonRole.patreon_2
+        mm_player.queue_time = 30
+        record = pickle.loads(pickle.dumps(mm_player.export_record()))
+        restored_player = player.Player.from_record(record)
+        assert restored_player.export_record() == mm_player.export_record()
+        assert restored_player.main == mm_player.main
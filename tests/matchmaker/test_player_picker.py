@@ -0,0 +1,97 @@
+import random
+from typing import Any, Callable
+
+import pytest
+
+from app.enums import PatreonRole
+from app.exceptions import NotEnoughPlayersError
+from app.matchmaker.lobby_partitioner import LobbyPartitioner
+from app.matchmaker.player import Player
+from app.matchmaker.player_picker import PlayerPicker
+from app.matchmaker.player_pool import PlayerPool
+
+
+@pytest.fixture()
+def queue_players(random_players: Callable[..., PlayerPool]) -> list[Player]:
+    """27 players, so 3 of them sit out"""
+    players = list(random_players(0)) + list(random_players(1))
+    return players + list(random_players(2))[:3]
+
+
+class TestPlayerPicker:
+    @pytest.mark.parametrize("team_size", (6, 8, 12))
+    def test_split_into_games(
+        self, random_players: Callable[..., PlayerPool], team_size: int
+    ) -> None:
+        players = list(random_players(0, team_size)) + list(
+            random_players(1, team_size)
+        )
+        players += list(random_players(2, team_size))[:3]
+        picker = PlayerPicker(players, team_size)
+        picker.enroll_players()
+        player_pools = picker.split_into_games()
+        assert picker.games_amount == 2
+        assert len(picker.excluded_players) == 3
+        assert all(len(player_pool) == team_size * 2 for player_pool in player_pools)
+
+    def test_not_enough_players(
+        self, random_players: Callable[..., PlayerPool]
+    ) -> None:
+        players = list(random_players(0, 6))
+        with pytest.raises(NotEnoughPlayersError):
+            PlayerPicker(players, 8)
+
+    @pytest.mark.parametrize(
+        "attribute,low_value,high_value",
+        [
+            ("patreon", PatreonRole.patreon_0, PatreonRole.patreon_2),
+            ("queue_time", 10, 300),
+            ("times_excluded", 0, 2),
+        ],
+    )
+    def test_lowest_priority_players_sit_out(
+        self,
+        queue_players: list[Player],
+        attribute: str,
+        low_value: Any,
+        high_value: Any,
+    ) -> None:
+        for player in queue_players:
+            setattr(player, attribute, high_value)
+        low_priority_players = queue_players[5:8]
+        for player in low_priority_players:
+            setattr(player, attribute, low_value)
+        picker = PlayerPicker(queue_players)
+        picker.enroll_players()
+        assert sorted(map(id, picker.excluded_players)) == sorted(
+            map(id, low_priority_players)
+        )
+
+    def test_patreon_tier_goes_first(self, queue_players: list[Player]) -> None:
+        for player in queue_players[:3]:
+            player.patreon = PatreonRole.patreon_1
+            player.queue_time = 0
+        for player in queue_players[3:]:
+            player.queue_time = 100
+        picker = PlayerPicker(queue_players)
+        picker.enroll_players()
+        assert all(
+            player not in picker.excluded_players for player in queue_players[:3]
+        )
+
+    def test_ties_are_broken_randomly(self, queue_players: list[Player]) -> None:
+        excluded_sets = set()
+        for seed in range(10):
+            picker = PlayerPicker(queue_players, rng=random.Random(seed))
+            picker.enroll_players()
+            excluded_sets.add(frozenset(map(id, picker.excluded_players)))
+        assert len(excluded_sets) > 1
+
+    def test_zero_sit_out_penalty_minimizes_spread(
+        self, queue_players: list[Player]
+    ) -> None:
+        picker = PlayerPicker(queue_players, sit_out_penalty=0)
+        picker.enroll_players()
+        groups, excluded_players = LobbyPartitioner(12).partition(queue_players)
+        assert picker.excluded_players == excluded_players
+        assert picker.player_groups == groups
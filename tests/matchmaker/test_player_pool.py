@@ -0,0 +1,98 @@
+from typing import Callable
+
+import pytest
+
+from app.enums import PlayerRole
+from app.matchmaker.game.role_swap import RoleSwap
+from app.matchmaker.player import ALL_ROLES
+from app.matchmaker.player_pool import PlayerPool
+
+
+def count_role_players(players: PlayerPool, role: PlayerRole) -> int:
+    return len([player for player in players if player.current_role == role])
+
+
+def get_mmr_deviation(players: PlayerPool) -> float:
+    avg_mmr = sum(player.mmr for player in players) / len(players)
+    dev_squares_sum = sum((avg_mmr - player.mmr) ** 2 for player in players)
+    return (dev_squares_sum / len(players)) ** 0.5
+
+
+class TestPlayerPool:
+    def test_role_players_amount(self, default_players: PlayerPool) -> None:
+        for role in PlayerRole:
+            assert default_players.get_role_players_amount(role) == count_role_players(
+                default_players, role
+            )
+
+    def test_mmr_aggregates(self, default_players: PlayerPool) -> None:
+        expected_avg_mmr = sum(player.mmr for player in default_players) / 12
+        assert default_players.avg_mmr == pytest.approx(expected_avg_mmr)
+        assert default_players.mmr_deviation == pytest.approx(
+            get_mmr_deviation(default_players)
+        )
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_aggregates_follow_role_swaps(
+        self, random_players: Callable[..., PlayerPool], seed: int
+    ) -> None:
+        players = random_players(seed)
+        swaps = []
+        for index, player in enumerate(players):
+            target_role = list(PlayerRole)[index % 3]
+            if player.current_role != target_role:
+                swaps.append(RoleSwap(player, target_role))
+        for swap in swaps:
+            swap.apply()
+        for role in PlayerRole:
+            assert players.get_role_players_amount(role) == count_role_players(
+                players, role
+            )
+        assert players.avg_mmr == pytest.approx(
+            sum(player.mmr for player in players) / 12
+        )
+        assert players.mmr_deviation == pytest.approx(get_mmr_deviation(players))
+        for swap in swaps:
+            swap.revert()
+        assert players.avg_mmr == pytest.approx(
+            sum(player.mmr_raw for player in players) / 12
+        )
+
+    def test_aggregates_follow_direct_role_changes(
+        self, default_players: PlayerPool
+    ) -> None:
+        for player in default_players:
+            player.current_role = PlayerRole.cav
+        assert default_players.get_role_players_amount(PlayerRole.cav) == 12
+        assert default_players.get_role_players_amount(PlayerRole.inf) == 0
+
+    def test_player_in_several_pools(
+        self, random_players: Callable[..., PlayerPool]
+    ) -> None:
+        players = random_players(0)
+        other_pool = PlayerPool(list(players))
+        for player in players:
+            player.current_role = PlayerRole.arch
+        assert players.get_role_players_amount(PlayerRole.arch) == 12
+        assert other_pool.get_role_players_amount(PlayerRole.arch) == 12
+
+    def test_columns(self, default_players: PlayerPool) -> None:
+        columns = default_players.columns
+        assert columns.mmr_raw == tuple(player.mmr_raw for player in default_players)
+        assert columns.igl == tuple(player.igl for player in default_players)
+        for index, player in enumerate(default_players):
+            assert ALL_ROLES[columns.main_roles[index]] == player.main
+            assert ALL_ROLES[columns.current_roles[index]] == player.current_role
+            for role_index, role in enumerate(ALL_ROLES):
+                assert columns.proficiencies[role_index][
+                    index
+                ] == player.get_role_proficiency(role)
+
+    def test_columns_follow_role_changes(self, default_players: PlayerPool) -> None:
+        assert default_players.columns is default_players.columns
+        player = default_players[0]
+        target_role = next(role for role in PlayerRole if role != player.main)
+        player.current_role = target_role
+        columns = default_players.columns
+        assert ALL_ROLES[columns.current_roles[0]] == target_role
+        assert columns.mmr[0] == player.mmr_reduced